@@ -0,0 +1,117 @@
+"""Client and load generator for the allocation service ( see app.allocation_server )."""
+from app.models import ParametersModel, PatientBatch
+from app.services import GenerationService
+from dataclasses import asdict
+import asyncio
+import itertools
+import json
+import time
+import numpy as np
+
+class AllocationClient:
+    """One connection to the allocation service, with any number of requests in flight."""
+
+    def __init__( self, path: str = None, host: str = "127.0.0.1", port: int = None ):
+        self.path = path
+        self.host = host
+        self.port = port
+        self._ids = itertools.count( 1 )
+        self._pending = {}
+        self._reader_task = None
+        self._writer = None
+
+    async def connect( self ):
+        if self.path is not None:
+            reader, self._writer = await asyncio.open_unix_connection( self.path )
+        else:
+            reader, self._writer = await asyncio.open_connection( self.host, self.port )
+        self._reader_task = asyncio.create_task( self._read_responses( reader ) )
+        return self
+
+    async def close( self ):
+        self._writer.close(  )
+        await self._writer.wait_closed(  )
+        self._reader_task.cancel(  )
+
+    async def __aenter__( self ):
+        return await self.connect(  )
+
+    async def __aexit__( self, *exc_info ):
+        await self.close(  )
+
+    async def _read_responses( self, reader: asyncio.StreamReader ):
+        while line := await reader.readline(  ):
+            message = json.loads( line )
+            future = self._pending.pop( message["id"], None )
+            if future is not None and not future.done(  ):
+                future.set_result( message )
+        for future in self._pending.values(  ):
+            if not future.done(  ):
+                future.set_exception( ConnectionError( "Connection closed by the allocation service" ) )
+
+    async def request( self, payload: dict ) -> dict:
+        """Send one request and wait for its answer; raises RuntimeError when the service reports an error."""
+        request_id = next( self._ids )
+        future = asyncio.get_running_loop(  ).create_future(  )
+        self._pending[request_id] = future
+        self._writer.write( ( json.dumps( { **payload, "id": request_id } ) + "\n" ).encode(  ) )
+        await self._writer.drain(  )
+        message = await future
+        if not message["ok"]:
+            raise RuntimeError( message["error"] )
+        return message["response"]
+
+    async def solve( self, scenario, strategy: str = "GREEDY" ) -> dict:
+        data = { "id": scenario.id, "patients": PatientBatch.from_scenario( scenario ).to_records(  ), "parameters": asdict( scenario.parameters ) }
+        return await self.request( { "op": "solve", "strategy": strategy, "scenario": data } )
+
+    async def arrivals( self, patients: list[ dict ], strategy: str = "GREEDY", free_beds: dict[ str, int ] = None ) -> dict:
+        payload = { "op": "arrivals", "strategy": strategy, "patients": patients }
+        if free_beds is not None:
+            payload["free_beds"] = free_beds
+        return await self.request( payload )
+
+    async def stats( self ) -> dict:
+        return await self.request( { "op": "stats" } )
+
+async def run_load( parameters: ParametersModel, num_requests: int = 1000, concurrency: int = 64, connections: int = 4,
+                    num_patients: int = 20, strategy: str = "GREEDY", seed: int = None, path: str = None,
+                    host: str = "127.0.0.1", port: int = None ) -> dict:
+    """Send num_requests arrival requests of num_patients generated patients, concurrency of them at a time.
+
+    Returns the throughput and client-side latency percentiles, with the service's own statistics.
+    """
+    rng = np.random.default_rng( seed )
+    pool = GenerationService( parameters ).generate_scenario_batch( 0, num_patients * min( num_requests, 256 ), rng ).patients.to_records(  )
+    clients = [ await AllocationClient( path, host, port ).connect(  ) for _ in range( connections ) ]
+    semaphore = asyncio.Semaphore( concurrency )
+    latencies = []
+    errors = 0
+
+    async def send( index: int ):
+        nonlocal errors
+        start = ( index * num_patients ) % len( pool )
+        async with semaphore:
+            sent = time.perf_counter(  )
+            try:
+                await clients[index % connections].arrivals( pool[start:start + num_patients], strategy )
+            except RuntimeError:
+                errors += 1
+            latencies.append( time.perf_counter(  ) - sent )
+
+    started = time.perf_counter(  )
+    await asyncio.gather( *( send( index ) for index in range( num_requests ) ) )
+    elapsed = time.perf_counter(  ) - started
+    server_stats = await clients[0].stats(  )
+    for client in clients:
+        await client.close(  )
+
+    latencies_ms = np.array( latencies ) * 1000
+    return {
+        "requests": num_requests,
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput": num_requests / elapsed,
+        "latency_ms": { f"p{q}": float( np.percentile( latencies_ms, q ) ) for q in ( 50, 90, 99 ) },
+        "server": server_stats,
+    }
@@ -0,0 +1,216 @@
+"""Allocation service: newline-delimited JSON requests over a Unix socket or TCP.
+
+Every request is one JSON object per line, answered by one line with the same "id":
+
+    {"id": 1, "op": "solve", "strategy": "GREEDY", "scenario": {"id": 7, "patients": [...], "parameters": {...}}}
+    {"id": 2, "op": "arrivals", "strategy": "MGS", "patients": [...], "free_beds": {"icu_0": 2}}
+    {"id": 3, "op": "stats"}
+
+Patients use the PatientBatch.to_records format. "solve" scenarios without parameters, and
+"arrivals" requests, use the server parameters; "arrivals" allocates the patients to the
+free beds given ( all beds by default ). Answers are {"id", "ok": true, "response": {...}}
+or {"id", "ok": false, "error": "..."}; responses of one connection may arrive out of order.
+
+Requests arriving within batch_window seconds are grouped, up to max_batch_size, and solved
+by a process pool whose workers keep a started Gurobi environment. Requests wait in a bounded
+queue; when it is full the server stops reading from connections until batches complete. When a
+worker dies the batches in flight fail and the pool is replaced.
+"""
+from app.models import ParametersModel, PatientBatch, ScenarioModel
+from app.solvers.registry import solver_entry
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, replace
+import asyncio
+import json
+import os
+import time
+import numpy as np
+
+DEFAULT_STRATEGY = "GREEDY"
+
+_parameters = None  # Server parameters, set in each worker process
+
+def _initialize_worker( parameters: dict, milp: bool ):
+    global _parameters
+    _parameters = ParametersModel.from_dict( parameters )
+    if milp:
+        from app.solvers import get_env
+        get_env( quiet = True )
+
+def request_scenario( request: dict, parameters: ParametersModel ) -> ScenarioModel:
+    op = request.get( "op", "solve" )
+    if op == "solve":
+        data = request["scenario"]
+        if "parameters" in data:
+            parameters = ParametersModel.from_dict( data["parameters"] )
+        patients = PatientBatch.from_records( data["patients"], parameters.icu_capacities.keys(  ) )
+        return ScenarioModel( id=data.get( "id", 0 ), patients=patients, parameters=parameters )
+    if op == "arrivals":
+        if "free_beds" in request:
+            parameters = replace( parameters, icu_capacities={ icu_type: int( request["free_beds"].get( icu_type, 0 ) ) for icu_type in parameters.icu_capacities } )
+        patients = PatientBatch.from_records( request["patients"], parameters.icu_capacities.keys(  ) )
+        return ScenarioModel( id=request.get( "scenario_id", 0 ), patients=patients, parameters=parameters )
+    raise ValueError( f"Unknown op {op!r}" )
+
+def solve_request( request: dict, parameters: ParametersModel ) -> dict:
+    scenario = request_scenario( request, parameters )
+    entry = solver_entry( request.get( "strategy", DEFAULT_STRATEGY ) )
+    if entry.milp:
+        from app.solvers import AllocationModel, get_env
+        response = entry.load(  )( scenario, AllocationModel( scenario, get_env( quiet = True ), quiet = True ) )
+    else:
+        response = entry.load(  )( scenario )
+    return asdict( response )
+
+def _solve_batch( requests: list[ dict ] ) -> list[ tuple[ bool, object ] ]:
+    results = []
+    for request in requests:
+        try:
+            results.append( ( True, solve_request( request, _parameters ) ) )
+        except Exception as e:  # Reported to the client of that request only
+            results.append( ( False, f"{type( e ).__name__}: {e}" ) )
+    return results
+
+class AllocationServer:
+    """Asyncio front end batching allocation requests onto a pool of solver processes."""
+
+    def __init__( self, parameters: ParametersModel, workers: int = None, batch_window: float = 0.005, max_batch_size: int = 32,
+                  queue_size: int = 1024, warm_milp: bool = True, latency_window: int = 100000 ):
+        self.parameters = parameters
+        self.workers = workers or os.cpu_count(  )
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.warm_milp = warm_milp
+        self._queue = asyncio.Queue( maxsize = queue_size )
+        self._latencies = deque( maxlen = latency_window )  # Seconds from receipt to answer of recent requests
+        self._batch_sizes = deque( maxlen = latency_window )
+        self.completed = 0
+        self.errors = 0
+        self.pool_restarts = 0
+        self._executor = None
+        self._server = None
+        self._batcher = None
+        self._slots = None
+        self._path = None
+
+    async def start( self, path: str = None, host: str = "127.0.0.1", port: int = 0 ):
+        """Listen on the Unix socket path, or on host:port when no path is given."""
+        self._executor = self._start_pool(  )
+        # Two batches per worker in flight: one solving, one queued, so workers never wait on the batcher
+        self._slots = asyncio.Semaphore( 2 * self.workers )
+        self._batcher = asyncio.create_task( self._batch_requests(  ) )
+        if path is not None:
+            self._path = path
+            self._server = await asyncio.start_unix_server( self._handle_connection, path = path )
+        else:
+            self._server = await asyncio.start_server( self._handle_connection, host = host, port = port )
+        return self._server
+
+    def _start_pool( self ) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers = self.workers, initializer = _initialize_worker, initargs = ( asdict( self.parameters ), self.warm_milp )
+        )
+
+    @property
+    def address( self ):
+        return self._server.sockets[0].getsockname(  )
+
+    async def serve_forever( self ):
+        async with self._server:
+            await self._server.serve_forever(  )
+
+    async def close( self ):
+        self._server.close(  )
+        await self._server.wait_closed(  )
+        self._batcher.cancel(  )
+        self._executor.shutdown( wait = True, cancel_futures = True )
+        if self._path is not None and os.path.exists( self._path ):
+            os.unlink( self._path )
+
+    def stats( self ) -> dict:
+        latencies = np.array( self._latencies ) * 1000
+        percentiles = { f"p{q}": float( np.percentile( latencies, q ) ) for q in ( 50, 90, 99 ) } if len( latencies ) else {}
+        return {
+            "completed": self.completed,
+            "errors": self.errors,
+            "pool_restarts": self.pool_restarts,
+            "queue_depth": self._queue.qsize(  ),
+            "mean_batch_size": float( np.mean( self._batch_sizes ) ) if self._batch_sizes else 0.0,
+            "latency_ms": { **percentiles, "max": float( latencies.max(  ) ) if len( latencies ) else None },
+        }
+
+    async def _handle_connection( self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter ):
+        pending = set(  )
+
+        async def answer( request_id, future: asyncio.Future ):
+            ok, result = await future
+            message = { "id": request_id, "ok": ok, "response" if ok else "error": result }
+            writer.write( ( json.dumps( message ) + "\n" ).encode(  ) )
+            await writer.drain(  )
+
+        try:
+            while line := await reader.readline(  ):
+                try:
+                    request = json.loads( line )
+                except json.JSONDecodeError as e:
+                    writer.write( ( json.dumps( { "id": None, "ok": False, "error": f"Invalid JSON: {e}" } ) + "\n" ).encode(  ) )
+                    continue
+                if request.get( "op" ) == "stats":
+                    writer.write( ( json.dumps( { "id": request.get( "id" ), "ok": True, "response": self.stats(  ) } ) + "\n" ).encode(  ) )
+                    continue
+
+                future = asyncio.get_running_loop(  ).create_future(  )
+                # Waits while the queue is full, which stops reading this connection ( backpressure )
+                await self._queue.put( ( request, future, time.perf_counter(  ) ) )
+                task = asyncio.create_task( answer( request.get( "id" ), future ) )
+                pending.add( task )
+                task.add_done_callback( pending.discard )
+            if pending:
+                await asyncio.gather( *pending, return_exceptions = True )
+        except ConnectionError:
+            pass
+        finally:
+            writer.close(  )
+
+    async def _batch_requests( self ):
+        loop = asyncio.get_running_loop(  )
+        while True:
+            batch = [ await self._queue.get(  ) ]
+            deadline = loop.time(  ) + self.batch_window
+            while len( batch ) < self.max_batch_size:
+                timeout = deadline - loop.time(  )
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append( await asyncio.wait_for( self._queue.get(  ), timeout ) )
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire(  )
+            asyncio.create_task( self._dispatch( batch ) )
+
+    async def _dispatch( self, batch: list ):
+        executor = self._executor
+        try:
+            results = await asyncio.get_running_loop(  ).run_in_executor( executor, _solve_batch, [ request for request, _, _ in batch ] )
+        except BrokenProcessPool as e:
+            # A dead worker breaks the pool: fail the batches it held and replace it once
+            results = [ ( False, f"{type( e ).__name__}: {e}" ) ] * len( batch )
+            if self._executor is executor:
+                self._executor = self._start_pool(  )
+                self.pool_restarts += 1
+                executor.shutdown( wait = False, cancel_futures = True )
+        except Exception as e:  # Fails the whole batch
+            results = [ ( False, f"{type( e ).__name__}: {e}" ) ] * len( batch )
+        finally:
+            self._slots.release(  )
+
+        now = time.perf_counter(  )
+        self._batch_sizes.append( len( batch ) )
+        for ( _, future, received ), ( ok, result ) in zip( batch, results ):
+            self.completed += 1
+            self.errors += not ok
+            self._latencies.append( now - received )
+            if not future.done(  ):
+                future.set_result( ( ok, result ) )
@@ -1,5 +1,8 @@
+import bisect
 import json
 import os
+import tempfile
+import threading
 
 class DatabaseError(Exception):
     """General exception for database-related errors."""
@@ -17,12 +20,30 @@ class FileOperationError(DatabaseError):
 class Database:
     def __init__(self, data_dir: str):
         self.data_dir = data_dir
+        self._generations = {}
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
 
     def _get_file_path(self, collection_name: str):
         return os.path.join(self.data_dir, f"{collection_name}.json")
 
+    def _get_storage_path(self, collection_name: str):
+        return self._get_file_path(collection_name)
+
+    def _touch(self, collection_name: str):
+        self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+
+    def signature(self, collection_name: str, check_file: bool = True) -> tuple:
+        """Changes whenever the collection is written, through this instance or (with check_file) on disk."""
+        generation = self._generations.get(collection_name, 0)
+        if not check_file:
+            return (generation,)
+        try:
+            stat = os.stat(self._get_storage_path(collection_name))
+            return (generation, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return (generation, None, None)
+
     def read(self, collection_name: str):
         try:
             file_path = self._get_file_path(collection_name)
@@ -33,11 +54,25 @@ class Database:
         except (OSError, json.JSONDecodeError) as e:
             raise FileOperationError(f"Error reading file {collection_name}.json: {e}")
 
+    def _atomic_write(self, file_path: str, content: str):
+        # Write to a temporary file in the same directory, then rename it over the target
+        fd, temp_path = tempfile.mkstemp(dir=self.data_dir, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
     def write(self, collection_name: str, data: list):
         try:
             file_path = self._get_file_path(collection_name)
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=4)
+            self._atomic_write(file_path, json.dumps(data, indent=4))
+            self._touch(collection_name)
         except OSError as e:
             raise FileOperationError(f"Error writing file {collection_name}.json: {e}")
 
@@ -64,11 +99,250 @@ class Database:
     def delete(self, collection_name: str, identifier: str, value):
         try:
             data = self.read(collection_name)
-            data = [obj for obj in data if obj.get(identifier) != value]
-            if len(data) == len(self.read(collection_name)):  # No item was deleted
+            remaining = [obj for obj in data if obj.get(identifier) != value]
+            if len(remaining) == len(data):  # No item was deleted
                 raise ItemNotFoundError(f"Item with {identifier} {value} not found for deletion.")
-            self.write(collection_name, data)
+            self.write(collection_name, remaining)
         except (FileOperationError, ItemNotFoundError) as e:
             raise e
 
-database = Database( "instances" )
\ No newline at end of file
+
+class _LiveItems:
+    """Live items of a collection log in log order, with a position index per identifier."""
+
+    def __init__(self, items: list = ()):
+        self.items = list(items)
+        self._indexes = {}
+
+    def _index(self, identifier: str) -> dict:
+        if identifier not in self._indexes:
+            index = {}
+            for position, item in enumerate(self.items):
+                if item is not None:
+                    self._add(index, item.get(identifier), position)
+            self._indexes[identifier] = index
+        return self._indexes[identifier]
+
+    @staticmethod
+    def _add(index: dict, value, position: int):
+        try:
+            bisect.insort(index.setdefault(value, []), position)
+        except TypeError:  # Unhashable values are only found by scanning
+            pass
+
+    def _unindex(self, position: int):
+        for identifier, index in self._indexes.items():
+            try:
+                positions = index[self.items[position].get(identifier)]
+            except (KeyError, TypeError):
+                continue
+            positions.remove(position)
+            if not positions:
+                del index[self.items[position].get(identifier)]
+
+    def positions(self, identifier: str, value) -> list[int]:
+        try:
+            return list(self._index(identifier).get(value, ()))
+        except TypeError:
+            return [i for i, item in enumerate(self.items) if item is not None and item.get(identifier) == value]
+
+    def put(self, item: dict):
+        self.items.append(item)
+        for identifier, index in self._indexes.items():
+            self._add(index, item.get(identifier), len(self.items) - 1)
+
+    def update(self, identifier: str, item: dict) -> bool:
+        """Replace the first item with the same identifier value."""
+        positions = self.positions(identifier, item.get(identifier))
+        if not positions:
+            return False
+        self._unindex(positions[0])
+        self.items[positions[0]] = item
+        for name, index in self._indexes.items():
+            self._add(index, item.get(name), positions[0])
+        return True
+
+    def delete(self, identifier: str, value) -> bool:
+        """Remove every item with the identifier value."""
+        positions = self.positions(identifier, value)
+        for position in positions:
+            self._unindex(position)
+            self.items[position] = None
+        return bool(positions)
+
+    def live(self) -> list:
+        return [dict(item) for item in self.items if item is not None]
+
+
+class JsonLinesDatabase(Database):
+    """Append-only JSON-lines log per collection.
+
+    Appends, updates and deletes each add one record to <collection>.jsonl; updates
+    and deletes are tombstones replayed on read. The log is rewritten atomically by
+    compact(), on demand or automatically (in a background thread when enabled) once
+    tombstones exceed compaction_ratio of the records. A legacy <collection>.json is
+    migrated to a log on first use. The live items of each log are kept indexed in
+    memory, so updates and deletes check existence without replaying the log.
+    """
+
+    def __init__(self, data_dir: str, compaction_ratio: float = 0.5, background_compaction: bool = True):
+        super().__init__(data_dir)
+        self.compaction_ratio = compaction_ratio
+        self.background_compaction = background_compaction
+        self._lock = threading.RLock()
+        self._tombstones = {}
+        self._repaired = set()
+        self._live = {}  # Collection name to (signature, _LiveItems) as of the last read or write
+
+    def _get_log_path(self, collection_name: str):
+        return os.path.join(self.data_dir, f"{collection_name}.jsonl")
+
+    def _get_storage_path(self, collection_name: str):
+        return self._get_log_path(collection_name)
+
+    def _ensure_log(self, collection_name: str):
+        legacy_path = self._get_file_path(collection_name)
+        if not os.path.exists(self._get_log_path(collection_name)) and os.path.exists(legacy_path):
+            self.write(collection_name, super().read(collection_name))
+            os.remove(legacy_path)
+
+    def _repair_tail(self, log_path: str):
+        # Drop a torn final line left by a crash so the next append starts on a fresh line
+        with open(log_path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position != end:
+                f.truncate(position)
+
+    def _append_record(self, collection_name: str, record: dict):
+        try:
+            log_path = self._get_log_path(collection_name)
+            if collection_name not in self._repaired and os.path.exists(log_path):
+                self._repair_tail(log_path)
+            self._repaired.add(collection_name)
+            with open(log_path, 'a') as f:
+                f.write(json.dumps(record, separators=(',', ':')) + "\n")
+            self._touch(collection_name)
+        except OSError as e:
+            raise FileOperationError(f"Error appending to {collection_name}.jsonl: {e}")
+
+    def _live_items(self, collection_name: str) -> _LiveItems:
+        # Replay the log again only if it was changed outside this instance
+        signature, live = self._live.get(collection_name, (None, None))
+        if live is None or signature != self.signature(collection_name):
+            self.read(collection_name)
+            signature, live = self._live[collection_name]
+        return live
+
+    def _store_live(self, collection_name: str, live: _LiveItems):
+        self._live[collection_name] = (self.signature(collection_name), live)
+
+    def read(self, collection_name: str):
+        with self._lock:
+            self._ensure_log(collection_name)
+            log_path = self._get_log_path(collection_name)
+            if not os.path.exists(log_path):
+                self._tombstones[collection_name] = (0, 0)
+                self._store_live(collection_name, _LiveItems())
+                return []
+            try:
+                with open(log_path, 'r') as f:
+                    lines = f.read().split("\n")
+            except OSError as e:
+                raise FileOperationError(f"Error reading file {collection_name}.jsonl: {e}")
+
+            live = _LiveItems()
+            records = tombstones = 0
+            for number, line in enumerate(lines):
+                if not line:
+                    continue
+                records += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    # A torn final line is an append interrupted by a crash; anything else is corruption
+                    if number == len(lines) - 1:
+                        break
+                    raise FileOperationError(f"Error reading file {collection_name}.jsonl: {e}")
+
+                if record["op"] == "put":
+                    live.put(record["item"])
+                    continue
+                tombstones += 1
+                if record["op"] == "update":
+                    live.update(record["identifier"], record["item"])
+                elif record["op"] == "delete":
+                    live.delete(record["identifier"], record["value"])
+            self._tombstones[collection_name] = (tombstones, records)
+            self._store_live(collection_name, live)
+            return live.live()
+
+    def write(self, collection_name: str, data: list):
+        with self._lock:
+            try:
+                content = "".join(json.dumps({"op": "put", "item": item}, separators=(',', ':')) + "\n" for item in data)
+                self._atomic_write(self._get_log_path(collection_name), content)
+                self._touch(collection_name)
+                self._tombstones[collection_name] = (0, len(data))
+                self._store_live(collection_name, _LiveItems(dict(item) for item in data))
+            except OSError as e:
+                raise FileOperationError(f"Error writing file {collection_name}.jsonl: {e}")
+
+    def append(self, collection_name: str, item: dict):
+        with self._lock:
+            self._ensure_log(collection_name)
+            signature, live = self._live.pop(collection_name, (None, None))
+            current = live is not None and signature == self.signature(collection_name)
+            self._append_record(collection_name, {"op": "put", "item": item})
+            if collection_name in self._tombstones:
+                tombstones, records = self._tombstones[collection_name]
+                self._tombstones[collection_name] = (tombstones, records + 1)
+            # Keep the index only if it was current; otherwise the next update or delete replays the log
+            if current:
+                live.put(dict(item))
+                self._store_live(collection_name, live)
+
+    def update(self, collection_name: str, item: dict, identifier: str):
+        with self._lock:
+            live = self._live_items(collection_name)
+            if not live.positions(identifier, item.get(identifier)):
+                raise ItemNotFoundError(f"Item with {identifier} {item.get(identifier)} not found for update.")
+            self._append_record(collection_name, {"op": "update", "identifier": identifier, "item": item})
+            live.update(identifier, dict(item))
+            self._store_live(collection_name, live)
+            self._record_tombstone(collection_name)
+
+    def delete(self, collection_name: str, identifier: str, value):
+        with self._lock:
+            live = self._live_items(collection_name)
+            if not live.positions(identifier, value):
+                raise ItemNotFoundError(f"Item with {identifier} {value} not found for deletion.")
+            self._append_record(collection_name, {"op": "delete", "identifier": identifier, "value": value})
+            live.delete(identifier, value)
+            self._store_live(collection_name, live)
+            self._record_tombstone(collection_name)
+
+    def _record_tombstone(self, collection_name: str):
+        tombstones, records = self._tombstones.get(collection_name, (0, 0))
+        tombstones, records = tombstones + 1, records + 1
+        self._tombstones[collection_name] = (tombstones, records)
+        if tombstones > self.compaction_ratio * records:
+            if self.background_compaction:
+                threading.Thread(target=self.compact, args=(collection_name,), daemon=True).start()
+            else:
+                self.compact(collection_name)
+
+    def compact(self, collection_name: str):
+        """Rewrite the log of a collection with only its live items."""
+        with self._lock:
+            self.write(collection_name, self._live_items(collection_name).live())
+
+database = JsonLinesDatabase( "instances" )
\ No newline at end of file
@@ -0,0 +1,104 @@
+from contextlib import contextmanager, nullcontext
+import time
+
+def _attribute(model, name: str):
+    # Gurobi raises for attributes without a value, e.g. MIPGap of an unbounded model
+    try:
+        return getattr(model, name)
+    except AttributeError:
+        return None
+
+class Instrumentation:
+    """Per-scenario records of phase timings and Gurobi solve statistics."""
+
+    def __init__(self):
+        self.records = []
+
+    def start_scenario(self, **labels):
+        self.records.append({"labels": labels, "phases": {}, "solves": []})
+
+    def add_records(self, records: list):
+        # Records made by copies of this instance, e.g. in worker processes
+        self.records.extend(records)
+
+    def _current(self) -> dict:
+        if not self.records:
+            self.start_scenario()
+        return self.records[-1]
+
+    @contextmanager
+    def phase(self, name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            timing = self._current()["phases"].setdefault(name, {"wall": 0.0, "cpu": 0.0, "count": 0})
+            timing["wall"] += time.perf_counter() - wall
+            timing["cpu"] += time.process_time() - cpu
+            timing["count"] += 1
+
+    def record_model(self, strategy: str, model):
+        """Statistics of the last optimize() of a gurobipy Model, None where Gurobi has no value."""
+        self._current()["solves"].append({
+            "strategy": strategy,
+            "status": model.Status,
+            "runtime": model.Runtime,
+            "node_count": _attribute(model, "NodeCount") or 0.0,
+            "iter_count": _attribute(model, "IterCount") or 0.0,
+            "mip_gap": _attribute(model, "MIPGap"),
+            "objective": _attribute(model, "ObjVal"),
+            "num_vars": model.NumVars,
+            "num_constrs": model.NumConstrs,
+        })
+
+    def summary(self) -> dict:
+        phases = {}
+        solves = {}
+        for record in self.records:
+            for name, timing in record["phases"].items():
+                total = phases.setdefault(name, {"count": 0, "wall_total": 0.0, "cpu_total": 0.0})
+                total["count"] += timing["count"]
+                total["wall_total"] += timing["wall"]
+                total["cpu_total"] += timing["cpu"]
+            for solve in record["solves"]:
+                total = solves.setdefault(solve["strategy"], {
+                    "count": 0, "runtime_total": 0.0, "node_count_total": 0.0, "iter_count_total": 0.0,
+                    "max_mip_gap": None, "statuses": {},
+                })
+                total["count"] += 1
+                total["runtime_total"] += solve["runtime"]
+                total["node_count_total"] += solve["node_count"]
+                total["iter_count_total"] += solve["iter_count"]
+                if solve["mip_gap"] is not None:
+                    total["max_mip_gap"] = max(solve["mip_gap"], total["max_mip_gap"] or 0.0)
+                total["statuses"][solve["status"]] = total["statuses"].get(solve["status"], 0) + 1
+
+        for total in phases.values():
+            total["wall_mean"] = total["wall_total"] / total["count"]
+            total["cpu_mean"] = total["cpu_total"] / total["count"]
+        for total in solves.values():
+            total["runtime_mean"] = total["runtime_total"] / total["count"]
+            total["node_count_mean"] = total["node_count_total"] / total["count"]
+            total["iter_count_mean"] = total["iter_count_total"] / total["count"]
+        return {"num_scenarios": len(self.records), "phases": phases, "solves": solves}
+
+class NullInstrumentation:
+    """Disabled instrumentation: every hook is a no-op."""
+    records = ()
+
+    def start_scenario(self, **labels):
+        pass
+
+    def add_records(self, records: list):
+        pass
+
+    def phase(self, name: str):
+        return nullcontext()
+
+    def record_model(self, strategy: str, model):
+        pass
+
+    def summary(self) -> dict:
+        return {"num_scenarios": 0, "phases": {}, "solves": {}}
+
+NULL_INSTRUMENTATION = NullInstrumentation()
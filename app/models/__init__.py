@@ -1,5 +1,8 @@
 from .parameters_model import ParametersModel
-from .sofa_score_model import SOFAScoreModel
+from .sofa_score_model import SOFAScoreModel, SOFA_COMPONENTS, MAX_SOFA_SCORE
 from .patient_model import PatientModel
+from .patient_batch_model import PatientBatch
 from .scenario_model import ScenarioModel
-from .allocation_response_model import ICUAllocationResponseModel
\ No newline at end of file
+from .allocation_response_model import ICUAllocationResponseModel
+from .survival_estimate_model import SurvivalEstimateModel
+from .admission_simulation_result_model import AdmissionSimulationResultModel
\ No newline at end of file
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+@dataclass
+class AdmissionSimulationResultModel:
+    num_arrivals            : int
+    num_admitted            : int
+    num_abandoned           : int       # Patients who found no free bed within max_wait
+    num_declined            : int       # Patients the policy left without a bed although one was free
+    simulated_days          : float
+    throughput              : float     # Admissions per simulated day
+    mean_queue_wait         : float     # Days waited by admitted patients
+    p95_queue_wait          : float
+    expected_survival       : float     # Sum of the survival probabilities of every arrival
+    survivors               : int       # Sampled survival count
\ No newline at end of file
@@ -6,4 +6,7 @@ class ICUAllocationResponseModel:
     total_survival_in_icu   : int
     total_survival_out_icu  : int
     total_cost              : int
-    allocation              : dict[ int, str ]  # Patient ID to ICU type mapping
\ No newline at end of file
+    allocation              : dict[ int, str ]  # Patient ID to ICU type mapping
+    objective               : float = None      # Objective value of the allocation under its strategy
+    bound                   : float = None      # Best proven bound on the objective ( MILP bound or LP relaxation )
+    gap                     : float = None      # Relative gap | bound - objective | / | objective |
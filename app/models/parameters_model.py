@@ -11,6 +11,7 @@ class ParametersModel:
     sofa_to_survival_out_icu    : list[ dict[ str, str ] ]              # Survival chance outside ICU based on questions
     sofa_weights                : dict[ str, list[ float ] ] = None     # Weights for generating SOFA scores
     epidemic_weights            : dict[ str, list[ float ] ] = None     # Weights for generating epidemic SOFA scores
+    epidemic_profiles           : dict[ str, dict[ str, list[ float ] ] ] = None  # Named epidemic weights, overriding sofa_weights per component
 
     def __post_init__(self):
         if self.sofa_weights is None:
@@ -26,4 +27,41 @@ class ParametersModel:
             self.epidemic_weights = {
                 "respiration": [ 0.1, 0.2, 0.3, 0.3, 0.1 ],
                 "renal": [ 0.1, 0.2, 0.3, 0.3, 0.1 ]
-            }
\ No newline at end of file
+            }
+        if self.epidemic_profiles is None:
+            self.epidemic_profiles = {
+                "default": self.epidemic_weights,
+                "respiratory": {
+                    "respiration": [ 0.05, 0.15, 0.3, 0.3, 0.2 ],
+                    "cardiovascular": [ 0.3, 0.3, 0.2, 0.15, 0.05 ]
+                },
+                "septic": {
+                    "coagulation": [ 0.2, 0.3, 0.25, 0.15, 0.1 ],
+                    "liver": [ 0.3, 0.3, 0.2, 0.15, 0.05 ],
+                    "cardiovascular": [ 0.1, 0.2, 0.3, 0.25, 0.15 ],
+                    "renal": [ 0.15, 0.25, 0.3, 0.2, 0.1 ]
+                }
+            }
+
+    @classmethod
+    def from_dict( cls, data: dict ) -> "ParametersModel":
+        """Inverse of dataclasses.asdict after a JSON round trip, which turns integer SOFA keys into strings."""
+        data = dict( data )
+        for field in ( "sofa_to_survival_in_icu", "sofa_to_survival_out_icu" ):
+            if isinstance( data.get( field ), dict ):
+                data[field] = { int( score ): value for score, value in data[field].items(  ) }
+        return cls( **data )
+
+    @classmethod
+    def synthetic( cls, num_icu_types: int = 3, beds_per_type: int = 10, id: int = 0 ) -> "ParametersModel":
+        """Illustrative parameters with survival falling linearly in the SOFA score, for benchmarks and demos."""
+        icu_types = [ f"icu_{t}" for t in range( num_icu_types ) ]
+        return cls(
+            id=id,
+            icu_capacities={ icu_type: beds_per_type for icu_type in icu_types },
+            ideal_occupancy_rate=0.85,
+            daily_costs={ icu_type: 0.01 * ( t + 1 ) for t, icu_type in enumerate( icu_types ) },
+            penalty_multiplier=1.0,
+            sofa_to_survival_in_icu={ score: max( 0.05, 0.95 - 0.035 * score ) for score in range( 25 ) },
+            sofa_to_survival_out_icu={ score: max( 0.01, 0.9 - 0.06 * score ) for score in range( 25 ) },
+        )
@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+import numpy as np
+from . import SOFAScoreModel, PatientModel, SOFA_COMPONENTS
+
+@dataclass( eq = False )
+class PatientBatch:
+    ids                         : np.ndarray                    # ( n, ) patient ids
+    icu_types                   : tuple[ str, ... ]             # Column order of days_of_occupancy
+    sofa_scores                 : np.ndarray                    # ( n, 6 ) int8, columns in SOFA_COMPONENTS order
+    survival_prob_in_icu        : np.ndarray                    # ( n, ) float
+    survival_prob_out_icu       : np.ndarray                    # ( n, ) float
+    days_of_occupancy           : np.ndarray                    # ( n, n_icu_types ) days required per ICU type
+    is_burn_patient             : np.ndarray = None             # ( n, ) bool
+    burn_priority_icu           : np.ndarray = None             # ( n, ) int8
+    burn_priority_non_icu       : np.ndarray = None             # ( n, ) int8
+
+    def __post_init__( self ):
+        self.icu_types = tuple( self.icu_types )
+        if self.is_burn_patient is None:
+            self.is_burn_patient = np.zeros( len( self.ids ), dtype = bool )
+        if self.burn_priority_icu is None:
+            self.burn_priority_icu = np.zeros( len( self.ids ), dtype = np.int8 )
+        if self.burn_priority_non_icu is None:
+            self.burn_priority_non_icu = np.zeros( len( self.ids ), dtype = np.int8 )
+
+    def __len__( self ) -> int:
+        return len( self.ids )
+
+    def __getitem__( self, index ):
+        # Slices stay columnar, single rows are materialized as PatientModel views
+        if isinstance( index, slice ):
+            return PatientBatch(
+                ids=self.ids[index],
+                icu_types=self.icu_types,
+                sofa_scores=self.sofa_scores[index],
+                survival_prob_in_icu=self.survival_prob_in_icu[index],
+                survival_prob_out_icu=self.survival_prob_out_icu[index],
+                days_of_occupancy=self.days_of_occupancy[index],
+                is_burn_patient=self.is_burn_patient[index],
+                burn_priority_icu=self.burn_priority_icu[index],
+                burn_priority_non_icu=self.burn_priority_non_icu[index],
+             )
+        return PatientModel(
+            id=int( self.ids[index] ),
+            sofa_score=SOFAScoreModel( *self.sofa_scores[index].tolist(  ) ),
+            survival_prob_in_icu=float( self.survival_prob_in_icu[index] ),
+            survival_prob_out_icu=float( self.survival_prob_out_icu[index] ),
+            days_of_occupancy=dict( zip( self.icu_types, self.days_of_occupancy[index].tolist(  ) ) ),
+         )
+
+    def __iter__( self ):
+        for index in range( len( self ) ):
+            yield self[index]
+
+    def positions( self, patient_ids ) -> np.ndarray:
+        """Row of each given patient id."""
+        patient_ids = np.asarray( list( patient_ids ), dtype = self.ids.dtype )
+        order = np.argsort( self.ids, kind = "stable" )
+        return order[np.searchsorted( self.ids, patient_ids, sorter = order )]
+
+    def days_of_occupancy_for( self, icu_types ) -> np.ndarray:
+        """Days of occupancy with columns in the given ICU type order."""
+        return self.days_of_occupancy[:, [ self.icu_types.index( icu_type ) for icu_type in icu_types ]]
+
+    def allocation_indices( self, allocation: dict[ int, str ] ) -> np.ndarray:
+        """ICU type index of each patient in the allocation, -1 when not allocated."""
+        indices = np.full( len( self ), -1, dtype = np.int16 )
+        if allocation:
+            type_index = { icu_type: t for t, icu_type in enumerate( self.icu_types ) }
+            indices[self.positions( allocation.keys(  ) )] = [ type_index[icu_type] for icu_type in allocation.values(  ) ]
+        return indices
+
+    @classmethod
+    def from_patients( cls, patients: list[ PatientModel ], icu_types ) -> "PatientBatch":
+        icu_types = tuple( icu_types )
+        return cls(
+            ids=np.array( [ p.id for p in patients ], dtype = np.int64 ),
+            icu_types=icu_types,
+            sofa_scores=np.array(
+                [ [ getattr( p.sofa_score, component ) for component in SOFA_COMPONENTS ] for p in patients ], dtype = np.int8
+             ).reshape( len( patients ), len( SOFA_COMPONENTS ) ),
+            survival_prob_in_icu=np.array( [ p.survival_prob_in_icu for p in patients ], dtype = float ),
+            survival_prob_out_icu=np.array( [ p.survival_prob_out_icu for p in patients ], dtype = float ),
+            days_of_occupancy=np.array(
+                [ [ p.days_of_occupancy[icu_type] for icu_type in icu_types ] for p in patients ], dtype = np.int16
+             ).reshape( len( patients ), len( icu_types ) ),
+            is_burn_patient=np.array( [ getattr( p, "is_burn_patient", False ) for p in patients ], dtype = bool ),
+            burn_priority_icu=np.array( [ getattr( p, "burn_priority_icu", 0 ) for p in patients ], dtype = np.int8 ),
+            burn_priority_non_icu=np.array( [ getattr( p, "burn_priority_non_icu", 0 ) for p in patients ], dtype = np.int8 ),
+         )
+
+    @classmethod
+    def from_records( cls, records: list[ dict ], icu_types ) -> "PatientBatch":
+        """Inverse of to_records: patients as JSON-like dicts with a sofa_score dict and days_of_occupancy per ICU type."""
+        icu_types = tuple( icu_types )
+        return cls(
+            ids=np.array( [ r["id"] for r in records ], dtype = np.int64 ),
+            icu_types=icu_types,
+            sofa_scores=np.array(
+                [ [ r["sofa_score"][component] for component in SOFA_COMPONENTS ] for r in records ], dtype = np.int8
+             ).reshape( len( records ), len( SOFA_COMPONENTS ) ),
+            survival_prob_in_icu=np.array( [ r["survival_prob_in_icu"] for r in records ], dtype = float ),
+            survival_prob_out_icu=np.array( [ r["survival_prob_out_icu"] for r in records ], dtype = float ),
+            days_of_occupancy=np.array(
+                [ [ r["days_of_occupancy"][icu_type] for icu_type in icu_types ] for r in records ], dtype = np.int16
+             ).reshape( len( records ), len( icu_types ) ),
+            is_burn_patient=np.array( [ r.get( "is_burn_patient", False ) for r in records ], dtype = bool ),
+            burn_priority_icu=np.array( [ r.get( "burn_priority_icu", 0 ) for r in records ], dtype = np.int8 ),
+            burn_priority_non_icu=np.array( [ r.get( "burn_priority_non_icu", 0 ) for r in records ], dtype = np.int8 ),
+         )
+
+    def to_records( self ) -> list[ dict ]:
+        return [
+            {
+                "id": patient_id,
+                "sofa_score": dict( zip( SOFA_COMPONENTS, sofa_score ) ),
+                "survival_prob_in_icu": survival_prob_in_icu,
+                "survival_prob_out_icu": survival_prob_out_icu,
+                "days_of_occupancy": dict( zip( self.icu_types, days_of_occupancy ) ),
+                "is_burn_patient": is_burn_patient,
+                "burn_priority_icu": burn_priority_icu,
+                "burn_priority_non_icu": burn_priority_non_icu,
+            }
+            for patient_id, sofa_score, survival_prob_in_icu, survival_prob_out_icu, days_of_occupancy, is_burn_patient, burn_priority_icu, burn_priority_non_icu in zip(
+                self.ids.tolist(  ), self.sofa_scores.tolist(  ), self.survival_prob_in_icu.tolist(  ), self.survival_prob_out_icu.tolist(  ),
+                self.days_of_occupancy.tolist(  ), self.is_burn_patient.tolist(  ), self.burn_priority_icu.tolist(  ), self.burn_priority_non_icu.tolist(  )
+             )
+        ]
+
+    @classmethod
+    def from_scenario( cls, scenario ) -> "PatientBatch":
+        """Columnar patients of a scenario, converting a list of PatientModel when needed."""
+        if isinstance( scenario.patients, PatientBatch ):
+            return scenario.patients
+        return cls.from_patients( scenario.patients, scenario.parameters.icu_capacities.keys(  ) )
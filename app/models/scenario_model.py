@@ -1,8 +1,8 @@
 from dataclasses import dataclass
-from . import ParametersModel, PatientModel
+from . import ParametersModel, PatientModel, PatientBatch
 
 @dataclass
 class ScenarioModel:
     id          : int
-    patients    : list[ PatientModel ]
+    patients    : list[ PatientModel ] | PatientBatch    # PatientBatch for columnar scenarios
     parameters  : ParametersModel
\ No newline at end of file
@@ -1,5 +1,8 @@
 from dataclasses import dataclass
 
+SOFA_COMPONENTS = ( "respiration", "coagulation", "liver", "cardiovascular", "cns", "renal" )
+MAX_SOFA_SCORE = 4 * len( SOFA_COMPONENTS )
+
 @dataclass
 class SOFAScoreModel:
     respiration         : int  # PaO2/FiO2 mmHg
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+@dataclass
+class SurvivalEstimateModel:
+    mean                    : float
+    variance                : float                     # Sample variance of the survival count across replications
+    confidence_interval     : tuple[ float, float ]     # Confidence interval of the mean
+    confidence              : float
+    num_replications        : int
\ No newline at end of file
@@ -0,0 +1,74 @@
+from app.database import ItemNotFoundError, DatabaseError
+import json
+from .base_repository import BaseRepository
+
+class CachedRepository(BaseRepository):
+    """BaseRepository keeping its collection parsed in memory, with hash indexes.
+
+    The cache is reloaded when the collection is written through the same Database
+    instance or, with check_file, when the file's mtime or size changes. Items are also
+    kept as JSON text, and lookups parse fresh copies from it, so callers may modify
+    them as with freshly read ones.
+    """
+
+    def __init__(self, collection_name: str, indexes: tuple[str, ...] = ('id',), check_file: bool = True):
+        super().__init__(collection_name)
+        self.check_file = check_file
+        self._indexed = list(indexes)
+        self._items = []
+        self._texts = []  # JSON text of each item
+        self._all_text = "[]"  # JSON text of the whole collection
+        self._indexes = {}
+        self._signature = None
+
+    def register_index(self, identifier: str):
+        if identifier not in self._indexed:
+            self._indexed.append(identifier)
+            self._signature = None
+
+    def invalidate(self):
+        self._signature = None
+
+    def _load(self) -> list:
+        signature = self.database.signature(self.collection_name, self.check_file)
+        if signature != self._signature:
+            self._items = self.database.read(self.collection_name)
+            self._texts = [json.dumps(item, separators=(',', ':')) for item in self._items]
+            self._all_text = "[" + ",".join(self._texts) + "]"
+            self._indexes = {identifier: {} for identifier in self._indexed}
+            for position, item in enumerate(self._items):
+                for identifier, index in self._indexes.items():
+                    try:
+                        index.setdefault(item.get(identifier), []).append(position)
+                    except TypeError:  # Unhashable values are only found by scanning
+                        pass
+            self._signature = signature
+        return self._items
+
+    def get_all(self):
+        try:
+            self._load()
+            return json.loads(self._all_text)
+        except DatabaseError as e:
+            raise DatabaseError(f"Error getting all items from {self.collection_name}: {e}")
+
+    def get(self, identifier: str, value):
+        try:
+            items = self._load()
+            positions = None
+            if identifier in self._indexes:
+                try:
+                    positions = self._indexes[identifier].get(value, [])
+                except TypeError:
+                    pass
+            if positions is None:
+                positions = [position for position, item in enumerate(items) if item.get(identifier) == value]
+            return [json.loads(self._texts[position]) for position in positions]
+        except DatabaseError as e:
+            raise DatabaseError(f"Error getting items by {identifier} from {self.collection_name}: {e}")
+
+    def get_by_id(self, id: int):
+        items = self.get('id', id)
+        if not items:
+            raise ItemNotFoundError(f"Item with id {id} not found in {self.collection_name}")
+        return items[0]
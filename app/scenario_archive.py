@@ -0,0 +1,90 @@
+from app.models import ParametersModel, PatientBatch, ScenarioModel
+from dataclasses import asdict
+import json
+import os
+import struct
+import numpy as np
+
+# File layout: MAGIC, header length (uint64 little endian), JSON header, then every
+# patient column as a raw C-ordered array starting at a 64-byte aligned offset
+MAGIC = b"ICUSCN01"
+ALIGNMENT = 64
+COLUMNS = (
+    "ids",
+    "sofa_scores",
+    "survival_prob_in_icu",
+    "survival_prob_out_icu",
+    "days_of_occupancy",
+    "is_burn_patient",
+    "burn_priority_icu",
+    "burn_priority_non_icu",
+)
+
+class ScenarioArchiveError(Exception):
+    """Raised when a file is not a valid scenario archive."""
+    pass
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def save_scenario(path: str, scenario: ScenarioModel):
+    """Write a scenario as a binary archive whose patient columns can be memory-mapped."""
+    batch = PatientBatch.from_scenario(scenario)
+    arrays = {name: np.ascontiguousarray(getattr(batch, name)) for name in COLUMNS}
+
+    header = {
+        "scenario_id": scenario.id,
+        "parameters": asdict(scenario.parameters),
+        "icu_types": list(batch.icu_types),
+        "columns": {},
+    }
+    # The header size depends on the offsets it stores, so lay the columns out after a generous estimate
+    provisional = json.dumps({**header, "columns": {name: {"dtype": array.dtype.str, "shape": list(array.shape), "offset": 10 ** 18} for name, array in arrays.items()}})
+    offset = _aligned(len(MAGIC) + 8 + len(provisional.encode()))
+    for name, array in arrays.items():
+        header["columns"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode()
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(header["columns"][name]["offset"])
+            f.write(array.tobytes())
+    os.replace(temp_path, path)
+
+def load_scenario(path: str, mmap: bool = True) -> ScenarioModel:
+    """Open a scenario archive; with mmap the patient columns are read-only views of the file."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ScenarioArchiveError(f"{path} is not a scenario archive")
+        (header_length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length))
+
+    columns = {}
+    for name, column in header["columns"].items():
+        dtype, shape = np.dtype(column["dtype"]), tuple(column["shape"])
+        if 0 in shape:
+            columns[name] = np.empty(shape, dtype=dtype)
+        elif mmap:
+            columns[name] = np.memmap(path, dtype=dtype, mode="r", offset=column["offset"], shape=shape)
+        else:
+            columns[name] = np.fromfile(path, dtype=dtype, count=int(np.prod(shape)), offset=column["offset"]).reshape(shape)
+
+    patients = PatientBatch(icu_types=tuple(header["icu_types"]), **columns)
+    return ScenarioModel(id=header["scenario_id"], patients=patients, parameters=ParametersModel.from_dict(header["parameters"]))
+
+def save_scenario_library(directory: str, scenarios):
+    """Archive every scenario of an iterable as <directory>/scenario_<id>.icus."""
+    os.makedirs(directory, exist_ok=True)
+    for scenario in scenarios:
+        save_scenario(os.path.join(directory, f"scenario_{scenario.id}.icus"), scenario)
+
+def load_scenario_library(directory: str, mmap: bool = True):
+    """Yield the archived scenarios of a library in file name order."""
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith(".icus"):
+            yield load_scenario(os.path.join(directory, file_name), mmap)
@@ -1,2 +1,3 @@
 from .generation_service import GenerationService
-from .simulation_service import SimulationService
\ No newline at end of file
+from .simulation_service import SimulationService
+from .admission_simulation_service import AdmissionSimulationService
\ No newline at end of file
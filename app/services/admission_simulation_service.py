@@ -0,0 +1,105 @@
+from app.models import ScenarioModel, PatientBatch, AdmissionSimulationResultModel
+from app.solvers import AdmissionPolicy
+from . import GenerationService
+from .generation_service import resolve_rng
+from collections import deque
+import heapq
+import numpy as np
+
+class AdmissionSimulationService:
+    """Discrete-event simulation of patients arriving over time and releasing their beds.
+
+    A patient admitted to ICU type t holds the bed for days_of_occupancy[t] days.
+    Patients who find no free bed wait in a FIFO queue for at most max_wait days. Every
+    arrival ends up admitted, abandoned ( no bed in time ) or declined by the policy.
+    """
+
+    def __init__(self, generation_service: GenerationService):
+        self.generation_service = generation_service
+
+    def simulate(self, policy: AdmissionPolicy, days: float, arrival_rate: float, max_wait: float = 0.0,
+                 rng: np.random.Generator = None) -> AdmissionSimulationResultModel:
+        """Poisson arrivals at arrival_rate patients per day over the given number of days."""
+        rng = resolve_rng(rng)
+        num_arrivals = int(rng.poisson(arrival_rate * days))
+        arrival_times = np.sort(rng.uniform(0, days, num_arrivals))
+        scenario = self.generation_service.generate_scenario_batch(0, num_arrivals, rng)
+        return self.run(scenario, arrival_times, policy, max_wait, days, rng)
+
+    def run(self, scenario: ScenarioModel, arrival_times: np.ndarray, policy: AdmissionPolicy, max_wait: float = 0.0,
+            simulated_days: float = None, rng: np.random.Generator = None) -> AdmissionSimulationResultModel:
+        """Replay a scenario whose patients arrive at the given (sorted) times."""
+        batch = PatientBatch.from_scenario(scenario)
+        icu_types = list(scenario.parameters.icu_capacities.keys())
+        free_beds = [scenario.parameters.icu_capacities[icu_type] for icu_type in icu_types]
+        total_capacity = sum(free_beds)
+        days_of_occupancy = batch.days_of_occupancy_for(icu_types).tolist()
+        arrivals = np.asarray(arrival_times, dtype=float).tolist()
+        policy.prepare(scenario)
+
+        admitted_type = np.full(len(batch), -1)
+        admission_time = np.full(len(batch), np.nan)
+        departures = []  # Heap of (release time, ICU type index)
+        queue = deque()
+        num_abandoned = num_declined = 0
+
+        def admit(index: int, t: int, now: float):
+            free_beds[t] -= 1
+            admitted_type[index] = t
+            admission_time[index] = now
+            heapq.heappush(departures, (now + days_of_occupancy[index][t], t))
+
+        def release(now: float, t: int):
+            nonlocal num_abandoned, num_declined
+            free_beds[t] += 1
+            # Offer the freed bed to waiting patients in arrival order
+            while queue:
+                index = queue.popleft()
+                if arrivals[index] + max_wait < now:
+                    num_abandoned += 1
+                    continue
+                chosen = policy.choose(index, free_beds, total_capacity - sum(free_beds))
+                if chosen >= 0:
+                    admit(index, chosen, now)
+                    return
+                num_declined += 1
+
+        for index, now in enumerate(arrivals):
+            while departures and departures[0][0] <= now:
+                release(*heapq.heappop(departures))
+
+            chosen = policy.choose(index, free_beds, total_capacity - sum(free_beds))
+            if chosen >= 0:
+                admit(index, chosen, now)
+            elif any(free_beds):
+                num_declined += 1
+            elif max_wait > 0:
+                queue.append(index)
+            else:
+                num_abandoned += 1
+
+        # Drain the queue with the beds released after the last arrival
+        while departures and queue:
+            release(*heapq.heappop(departures))
+        num_abandoned += len(queue)
+
+        admitted = admitted_type >= 0
+        waits = (admission_time - np.asarray(arrivals))[admitted]
+        if simulated_days is None:
+            simulated_days = arrivals[-1] if arrivals else 0.0
+
+        thresholds = np.where(admitted, np.maximum(batch.survival_prob_in_icu, batch.survival_prob_out_icu), batch.survival_prob_out_icu)
+        survived = resolve_rng(rng).random(len(batch)) <= thresholds
+
+        return AdmissionSimulationResultModel(
+            num_arrivals=len(batch),
+            num_admitted=int(admitted.sum()),
+            num_abandoned=num_abandoned,
+            num_declined=num_declined,
+            simulated_days=float(simulated_days),
+            throughput=float(admitted.sum() / simulated_days) if simulated_days else 0.0,
+            mean_queue_wait=float(waits.mean()) if len(waits) else 0.0,
+            p95_queue_wait=float(np.percentile(waits, 95)) if len(waits) else 0.0,
+            expected_survival=float(thresholds.sum()),
+            survivors=int(survived.sum()),
+        )
@@ -1,6 +1,19 @@
-from app.models import SOFAScoreModel, ParametersModel, PatientModel, ScenarioModel
+from app.models import SOFAScoreModel, ParametersModel, PatientModel, PatientBatch, ScenarioModel, SOFA_COMPONENTS, MAX_SOFA_SCORE
 import random
 from dataclasses import dataclass
+import numpy as np
+
+# Survival probability given to "very low" survival table entries in batch generation
+VERY_LOW_SURVIVAL_PROBABILITY = 0.05
+
+# ICU burn priority contributed by each SOFA total score
+SOFA_BURN_PRIORITY = np.array([1] * 6 + [2] * 4 + [3] * 2 + [4] * (MAX_SOFA_SCORE - 11), dtype=np.int8)
+
+def resolve_rng(rng: np.random.Generator = None) -> np.random.Generator:
+    # Derive a generator from the global random state so random.seed keeps runs reproducible
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+    return rng
 
 @dataclass
 class SOFAScoreModel:
@@ -123,6 +136,120 @@ class GenerationService:
 
         return patient
 
+    def sofa_lookup_tables(self, mapping, scores: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+        """Survival probability and "very low" flag indexed by SOFA total score.
+
+        "very low" entries get VERY_LOW_SURVIVAL_PROBABILITY. Scores missing from mapping, or
+        with values that are not probabilities, are NaN; when one of the given drawn scores is,
+        a KeyError ( like generate_patient ) or a ValueError is raised.
+        """
+        values = []
+        missing = []
+        probabilities = np.full(MAX_SOFA_SCORE + 1, np.nan)
+        for score in range(MAX_SOFA_SCORE + 1):
+            try:
+                values.append(mapping[score])
+            except (KeyError, IndexError):
+                values.append(None)
+                missing.append(score)
+                continue
+            try:
+                probabilities[score] = VERY_LOW_SURVIVAL_PROBABILITY if values[score] == "very low" else float(values[score])
+            except (TypeError, ValueError):
+                pass
+
+        if scores is not None:
+            drawn = np.unique(scores)
+            drawn_missing = np.intersect1d(missing, drawn)
+            if len(drawn_missing):
+                raise KeyError(int(drawn_missing[0]))
+            invalid = drawn[np.isnan(probabilities[drawn])]
+            if len(invalid):
+                raise ValueError(f"Survival probability {values[invalid[0]]!r} of SOFA score {invalid[0]} is not a number")
+        very_low = np.array([value == "very low" for value in values])
+        return probabilities, very_low
+
+    def calculate_burn_priorities(self, sofa_scores: np.ndarray, survival_very_low: np.ndarray, act: np.ndarray, critical_areas: np.ndarray):
+        """Vectorized calculate_burn_priority for a batch of patients."""
+        sofa_total = sofa_scores.sum(axis=1)
+
+        burn_priority_icu = np.where(act > 40, 5, np.where(act >= 20, 3, 1))
+        burn_priority_icu += critical_areas
+        burn_priority_icu += SOFA_BURN_PRIORITY[sofa_total]
+        burn_priority_icu += sofa_scores[:, SOFA_COMPONENTS.index("respiration")] >= 3
+        burn_priority_icu += sofa_scores[:, SOFA_COMPONENTS.index("cardiovascular")] >= 3
+        burn_priority_icu = np.minimum(burn_priority_icu, 5)
+
+        burn_priority_non_icu = np.select(
+            [survival_very_low, (sofa_total <= 5) & ~critical_areas, (sofa_total >= 6) & (sofa_total <= 9)],
+            [1, 5, 3],
+            default=2,
+        )
+        return burn_priority_icu.astype(np.int8), burn_priority_non_icu.astype(np.int8)
+
+    def sofa_component_weights(self, epidemic: str = None) -> dict[str, list[float]]:
+        """SOFA weights per component, overridden by the components of a named epidemic profile."""
+        if epidemic is None:
+            return self.parameters.sofa_weights
+        if epidemic not in self.parameters.epidemic_profiles:
+            raise ValueError(f"Unknown epidemic profile {epidemic!r}, expected one of {sorted(self.parameters.epidemic_profiles)}")
+        return {**self.parameters.sofa_weights, **self.parameters.epidemic_profiles[epidemic]}
+
+    def sample_sofa_scores(self, num_patients: int, weights: dict[str, list[float]], rng: np.random.Generator = None) -> np.ndarray:
+        """Inverse-CDF sampling of all SOFA components of num_patients at once, shape (num_patients, 6)."""
+        rng = resolve_rng(rng)
+        weights = np.array([weights[component] for component in SOFA_COMPONENTS], dtype=float)
+        cumulative = np.cumsum(weights / weights.sum(axis=1, keepdims=True), axis=1)
+        uniforms = rng.random((num_patients, len(SOFA_COMPONENTS)))
+        return (uniforms[:, :, None] >= cumulative[None, :, :-1]).sum(axis=2).astype(np.int8)
+
+    def generate_epidemic_sofa_scores(self, num_patients: int, epidemic: str = "default", rng: np.random.Generator = None) -> np.ndarray:
+        return self.sample_sofa_scores(num_patients, self.sofa_component_weights(epidemic), rng)
+
+    def generate_patient_columns(self, num_patients: int, rng: np.random.Generator = None, epidemic: str = None) -> dict[str, np.ndarray]:
+        """Draw every patient attribute of a scenario as arrays in one pass, with SOFA weights of an epidemic profile if given."""
+        rng = resolve_rng(rng)
+        icu_types = list(self.parameters.icu_capacities.keys())
+
+        sofa_scores = self.sample_sofa_scores(num_patients, self.sofa_component_weights(epidemic), rng)
+        sofa_total = sofa_scores.sum(axis=1)
+
+        survival_in_icu_table, _ = self.sofa_lookup_tables(self.parameters.sofa_to_survival_in_icu, sofa_total)
+        survival_out_icu_table, very_low_table = self.sofa_lookup_tables(self.parameters.sofa_to_survival_out_icu, sofa_total)
+        survival_prob_in_icu = survival_in_icu_table[sofa_total]
+        survival_prob_out_icu = survival_out_icu_table[sofa_total]
+        days_of_occupancy = rng.integers(1, 11, size=(num_patients, len(icu_types)), dtype=np.int16)
+
+        is_burn_patient = rng.random(num_patients) < 0.5
+        act = rng.uniform(5, 60, num_patients)
+        critical_areas = rng.random(num_patients) < 0.5
+
+        survival_very_low = very_low_table[sofa_total]
+        burn_priority_icu, burn_priority_non_icu = self.calculate_burn_priorities(sofa_scores, survival_very_low, act, critical_areas)
+        burn_priority_icu[~is_burn_patient] = 0
+        burn_priority_non_icu[~is_burn_patient] = 0
+
+        return {
+            "sofa_scores": sofa_scores,
+            "survival_prob_in_icu": survival_prob_in_icu,
+            "survival_prob_out_icu": survival_prob_out_icu,
+            "days_of_occupancy": days_of_occupancy,
+            "is_burn_patient": is_burn_patient,
+            "burn_priority_icu": burn_priority_icu,
+            "burn_priority_non_icu": burn_priority_non_icu,
+        }
+
+    def generate_scenario_batch(self, scenario_id: int, num_patients: int, rng: np.random.Generator = None,
+                                epidemic: str = None) -> ScenarioModel:
+        """Columnar scenario: patients are a PatientBatch instead of a list of PatientModel."""
+        columns = self.generate_patient_columns(num_patients, rng, epidemic)
+        patients = PatientBatch(
+            ids=np.arange(1, num_patients + 1),
+            icu_types=tuple(self.parameters.icu_capacities.keys()),
+            **columns,
+        )
+        return ScenarioModel(id=scenario_id, patients=patients, parameters=self.parameters)
+
     def generate_scenario(self, scenario_id: int, num_patients: int) -> ScenarioModel:
         patients = [
             self.generate_patient(patient_id=i, is_burn_patient=random.choice([True, False]), act=random.uniform(5, 60), critical_areas=random.choice([True, False]))
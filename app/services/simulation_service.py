@@ -1,46 +1,172 @@
-from app.models import ScenarioModel
+from app.models import ParametersModel, ScenarioModel, PatientBatch, SurvivalEstimateModel, ICUAllocationResponseModel
 from . import GenerationService
-from app.solvers import MGSSolver, LSFSolver, MSFSolver
+from .generation_service import resolve_rng
+from .sweep_checkpoint import SweepCheckpoint
+from app.instrumentation import Instrumentation, NULL_INSTRUMENTATION
+from app.solvers import SolverResultCache, scenario_fingerprint
+from app.solvers.registry import solver_entry
+from dataclasses import asdict
+import hashlib
+import json
+import os
 import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from statistics import NormalDist
+
+# Upper bound on uniforms drawn at once by simulate_survival_replications
+MAX_BLOCK_SIZE = 2 ** 22
+# Strategies evaluated when none are given, by registry name ( MSG is the MGS alias the results always used )
+DEFAULT_STRATEGIES = ("MSG", "LSF", "MSF", "FCFS", "GREEDY")
+
+def parameters_digest(parameters: ParametersModel) -> str:
+    """Stable hash of every generation and solver parameter, recorded in sweep checkpoints."""
+    content = json.dumps(asdict(parameters), sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def _initialize_worker(quiet: bool, milp: bool):
+    # Start the process's Gurobi environment up front, only when a MILP strategy will need it
+    if milp:
+        from app.solvers import get_env
+        get_env(quiet)
+
+class RunningStatistics:
+    """Streaming mean and sample variance ( Welford's algorithm ) in constant memory."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._squares = 0.0  # Sum of squared deviations from the mean
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._squares += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self._squares / (self.count - 1) if self.count > 1 else 0.0
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        if self.count < 2:
+            return float("inf")
+        return NormalDist().inv_cdf((1 + confidence) / 2) * (self.variance / self.count) ** 0.5
+
+    def estimate(self, confidence: float = 0.95) -> SurvivalEstimateModel:
+        half_width = self.half_width(confidence)
+        return SurvivalEstimateModel(
+            mean=self.mean,
+            variance=self.variance,
+            confidence_interval=(self.mean - half_width, self.mean + half_width),
+            confidence=confidence,
+            num_replications=self.count,
+        )
+
+def _simulate_job(service, epidemic, num_replications, strategies, job, seed_sequence):
+    # A job is a round and either one ratio or, with common random numbers, the tuple of all ratios
+    round_id, ratio = job
+    first_record = len(service.instrumentation.records)
+    if service.result_cache is not None:
+        service.result_cache.track_changes()
+    if isinstance(ratio, tuple):
+        survivals = service.simulate_pool_round(round_id, ratio, epidemic, num_replications, seed_sequence, strategies)
+    else:
+        survivals = [service.simulate_round(round_id, ratio, epidemic, num_replications, seed_sequence, strategies)]
+    # Records and cache changes are returned so the parent collects those made in worker processes
+    cache_changes = service.result_cache.changes() if service.result_cache is not None else None
+    return survivals, list(service.instrumentation.records[first_record:]), cache_changes
 
 class SimulationService:
-    def __init__(self, generation_service: GenerationService):
+    def __init__(self, generation_service: GenerationService, quiet: bool = True, result_cache: SolverResultCache = None,
+                 instrumentation: Instrumentation = None, gap_tolerance: float = None):
         self.generation_service = generation_service
+        self.quiet = quiet  # Silent Gurobi solves without variable names
+        self.result_cache = result_cache  # Skips solves already done for identical scenarios
+        self.instrumentation = instrumentation or NULL_INSTRUMENTATION  # Phase timings and solver statistics per scenario
+        self.gap_tolerance = gap_tolerance  # MILP strategies use the rounded LP relaxation when within this relative gap
 
-    def simulate(self, num_rounds: int, patient_to_bed_ratios: list[float], epidemic: str = None):
-        results = {
-            "MSG": [],
-            "LSF": [],
-            "MSF": [],
-            "FCFS": []
-        }
+    def simulate(self, num_rounds: int, patient_to_bed_ratios: list[float], epidemic: str = None, num_replications: int = 1,
+                 workers: int = 1, seed: int = None, common_random_numbers: bool = False, checkpoint: str = None,
+                 checkpoint_every: int = 16, strategies: list[str] = None):
+        """Average survival per strategy over num_rounds scenarios for each patient to bed ratio.
+
+        With a seed, or with workers other than 1, every (round, ratio) job draws from its own
+        child of SeedSequence(seed), so results do not depend on the number of workers.
+        workers=None uses one process per CPU, whose result cache hits, misses and solved responses
+        are merged into result_cache. epidemic names a profile of parameters.epidemic_profiles.
+        With common_random_numbers a job is a whole round, see simulate_pool_round.
 
-        for j in range(1, num_rounds + 1):
-            for ratio in patient_to_bed_ratios:
-                num_patients = int(sum(self.generation_service.parameters.icu_capacities.values()) * ratio)
-                scenario = self.generation_service.generate_scenario(j, num_patients)
-
-                if epidemic:
-                    for patient in scenario.patients:
-                        sofa_scores = self.generation_service.generate_epidemic_sofa_scores(1, epidemic)
-                        patient.sofa_score = sofa_scores[0]
-
-                # Solve using different allocation strategies
-                msg_response = MGSSolver(scenario)
-                lsf_response = LSFSolver(scenario)
-                msf_response = MSFSolver(scenario)
-                fcfs_response = self.fcfs_solver(scenario)
-
-                # Simulate survival
-                msg_survival = self.simulate_survival(scenario, msg_response.allocation)
-                lsf_survival = self.simulate_survival(scenario, lsf_response.allocation)
-                msf_survival = self.simulate_survival(scenario, msf_response.allocation)
-                fcfs_survival = self.simulate_survival(scenario, fcfs_response.allocation)
-
-                results["MSG"].append(msg_survival)
-                results["LSF"].append(lsf_survival)
-                results["MSF"].append(msf_survival)
-                results["FCFS"].append(fcfs_survival)
+        With a checkpoint path, completed jobs are appended to that log every checkpoint_every jobs
+        and a rerun with the same arguments skips them, drawing the same random streams as an
+        uninterrupted sweep ( the seed is stored in the log ). num_rounds may grow between runs;
+        other arguments, or the service's parameters, raise CheckpointMismatchError when they differ.
+
+        strategies names the registered solvers to compare, DEFAULT_STRATEGIES by default.
+        """
+        strategies = tuple(strategies or DEFAULT_STRATEGIES)
+        milp = any(solver_entry(strategy).milp for strategy in strategies)
+        results = {strategy: [] for strategy in strategies}
+
+        if common_random_numbers:
+            jobs = [(j, tuple(patient_to_bed_ratios)) for j in range(1, num_rounds + 1)]
+        else:
+            jobs = [(j, ratio) for j in range(1, num_rounds + 1) for ratio in patient_to_bed_ratios]
+        seed_sequences = [None] * len(jobs)
+        checkpoint_log = None
+        if checkpoint is not None:
+            config = {
+                "ratios": list(patient_to_bed_ratios),
+                "epidemic": epidemic,
+                "num_replications": num_replications,
+                "common_random_numbers": common_random_numbers,
+                "gap_tolerance": self.gap_tolerance,
+                "strategies": list(strategies),
+                "parameters": parameters_digest(self.generation_service.parameters),
+            }
+            if seed is not None or not os.path.exists(checkpoint):
+                config["entropy"] = np.random.SeedSequence(seed).entropy
+            checkpoint_log = SweepCheckpoint(checkpoint, config, checkpoint_every)
+            seed_sequences = np.random.SeedSequence(checkpoint_log.header["entropy"]).spawn(len(jobs))
+        elif seed is not None or workers != 1:
+            seed_sequences = np.random.SeedSequence(seed).spawn(len(jobs))
+
+        survivals_by_job = {}
+        if checkpoint_log is not None:
+            survivals_by_job = {index: job["survivals"] for index, job in checkpoint_log.completed.items() if index < len(jobs)}
+        pending = [index for index in range(len(jobs)) if index not in survivals_by_job]
+
+        def collect(outputs, parallel: bool):
+            for index, (survivals, records, cache_changes) in zip(pending, outputs):
+                if parallel:
+                    self.instrumentation.add_records(records)
+                    if cache_changes is not None:
+                        self.result_cache.merge(cache_changes)
+                survivals_by_job[index] = survivals
+                if checkpoint_log is not None:
+                    round_id, ratios = jobs[index]
+                    checkpoint_log.record(index, round_id, ratios if isinstance(ratios, tuple) else (ratios,), survivals)
+
+        simulate_job = partial(_simulate_job, self, epidemic, num_replications, strategies)
+        pending_jobs = [jobs[index] for index in pending]
+        pending_seed_sequences = [seed_sequences[index] for index in pending]
+        try:
+            if workers == 1:
+                collect(map(simulate_job, pending_jobs, pending_seed_sequences), parallel=False)
+            elif pending:
+                max_workers = workers or os.cpu_count()
+                with ProcessPoolExecutor(max_workers=max_workers, initializer=_initialize_worker, initargs=(self.quiet, milp)) as executor:
+                    chunksize = max(1, len(pending) // (4 * max_workers))
+                    collect(executor.map(simulate_job, pending_jobs, pending_seed_sequences, chunksize=chunksize), parallel=True)
+        finally:
+            if checkpoint_log is not None:
+                checkpoint_log.flush()
+
+        for index in range(len(jobs)):
+            for survival in survivals_by_job[index]:
+                for strategy, value in survival.items():
+                    results[strategy].append(value)
 
         # Average results
         averaged_results = {
@@ -48,7 +174,201 @@ class SimulationService:
         }
         return averaged_results
 
-    def simulate_survival(self, scenario: ScenarioModel, allocation: dict[int, str]) -> int:
+    def simulate_sequential(self, patient_to_bed_ratios: list[float], half_width: float, epidemic: str = None,
+                            num_replications: int = 1, min_rounds: int = 5, max_rounds: int = 1000,
+                            confidence: float = 0.95, separation: bool = True, seed: int = None,
+                            strategies: list[str] = None, min_difference: float = None) -> dict[float, dict[str, SurvivalEstimateModel]]:
+        """Survival estimate per ratio and strategy, adding rounds only where still uncertain.
+
+        A (ratio, strategy) cell stops after min_rounds once the confidence interval half-width of
+        its mean survival is at most half_width or, with separation, once its difference to every
+        other strategy at that ratio is settled: their intervals are disjoint or, with a target
+        min_difference, the difference is known to within min_difference (the sum of the two
+        half-widths is at most min_difference), so a difference of that size would be detected.
+        Each round solves only the strategies of its ratio still running, on a scenario seeded by
+        (seed, round, ratio).
+        """
+        strategies = tuple(strategies or DEFAULT_STRATEGIES)
+        statistics = {ratio: {strategy: RunningStatistics() for strategy in strategies} for ratio in patient_to_bed_ratios}
+        entropy = np.random.SeedSequence(seed).entropy
+
+        def settled(ratio, strategy):
+            cell = statistics[ratio][strategy]
+            if cell.count < min_rounds:
+                return False
+            if cell.half_width(confidence) <= half_width:
+                return True
+            return separation and all(
+                difference_settled(cell, other)
+                for name, other in statistics[ratio].items() if name != strategy
+            )
+
+        def difference_settled(cell, other):
+            half_widths = cell.half_width(confidence) + other.half_width(confidence)
+            return abs(cell.mean - other.mean) > half_widths or (min_difference is not None and half_widths <= min_difference)
+
+        for round_id in range(1, max_rounds + 1):
+            running = False
+            for index, ratio in enumerate(patient_to_bed_ratios):
+                pending = [strategy for strategy in strategies if not settled(ratio, strategy)]
+                if not pending:
+                    continue
+                running = True
+                seed_sequence = np.random.SeedSequence(entropy, spawn_key=(round_id, index))
+                survival = self.simulate_round(round_id, ratio, epidemic, num_replications, seed_sequence, pending)
+                for strategy, value in survival.items():
+                    statistics[ratio][strategy].add(value)
+            if not running:
+                break
+
+        return {
+            ratio: {strategy: cell.estimate(confidence) for strategy, cell in cells.items()}
+            for ratio, cells in statistics.items()
+        }
+
+    def _seed(self, seed_sequence: np.random.SeedSequence = None) -> np.random.Generator:
+        # Jobs draw only from this generator; the global random state of the caller is left alone
+        if seed_sequence is None:
+            return None
+        return np.random.default_rng(seed_sequence)
+
+    def num_patients(self, ratio: float) -> int:
+        return int(sum(self.generation_service.parameters.icu_capacities.values()) * ratio)
+
+    def simulate_round(self, round_id: int, ratio: float, epidemic: str = None, num_replications: int = 1,
+                       seed_sequence: np.random.SeedSequence = None, strategies: list[str] = None) -> dict[str, float]:
+        rng = self._seed(seed_sequence)
+        num_patients = self.num_patients(ratio)
+        self.instrumentation.start_scenario(round_id=round_id, ratio=ratio, num_patients=num_patients)
+        with self.instrumentation.phase("generation"):
+            # Epidemic rounds draw SOFA scores, and so survival probabilities, from the named epidemic profile
+            scenario = self.generation_service.generate_scenario_batch(round_id, num_patients, rng, epidemic)
+        return self.evaluate_scenario(scenario, num_replications, rng, strategies=strategies)
+
+    def simulate_pool_round(self, round_id: int, ratios: list[float], epidemic: str = None, num_replications: int = 1,
+                            seed_sequence: np.random.SeedSequence = None, strategies: list[str] = None) -> list[dict[str, float]]:
+        """Survival per strategy for each ratio, with common random numbers.
+
+        One patient pool is generated for the largest ratio and every ratio takes a prefix of it, so
+        smaller scenarios are nested in larger ones. Survival uniforms are drawn once per pool and
+        shared by every ratio and strategy ( num_replications x pool size of them with replications ).
+        """
+        rng = resolve_rng(self._seed(seed_sequence))
+        pool_size = max(self.num_patients(ratio) for ratio in ratios)
+        # The pool's generation is charged to the first ratio's record, so every record is one scenario.
+        self.instrumentation.start_scenario(round_id=round_id, ratio=ratios[0], num_patients=self.num_patients(ratios[0]),
+                                            pool_size=pool_size)
+        with self.instrumentation.phase("generation"):
+            pool = self.generation_service.generate_scenario_batch(round_id, pool_size, rng, epidemic)
+            uniforms = rng.random((num_replications, pool_size) if num_replications > 1 else pool_size)
+
+        survivals = []
+        for index, ratio in enumerate(ratios):
+            num_patients = self.num_patients(ratio)
+            if index > 0:
+                self.instrumentation.start_scenario(round_id=round_id, ratio=ratio, num_patients=num_patients)
+            scenario = ScenarioModel(id=round_id, patients=pool.patients[:num_patients], parameters=pool.parameters)
+            survivals.append(self.evaluate_scenario(scenario, num_replications, rng, uniforms[..., :num_patients], strategies))
+        return survivals
+
+    def evaluate_scenario(self, scenario: ScenarioModel, num_replications: int = 1, rng: np.random.Generator = None,
+                          uniforms: np.ndarray = None, strategies: list[str] = None) -> dict[str, float]:
+        """Survival per strategy ( DEFAULT_STRATEGIES unless strategies is given ) on one scenario."""
+        instrumentation = self.instrumentation
+
+        # Solve using different allocation strategies, sharing one MILP and the process's Gurobi environment.
+        # The MILP is only built when a strategy misses the result cache.
+        allocation_model = None
+
+        def solve_milp(solver):
+            nonlocal allocation_model
+            if allocation_model is None:
+                from app.solvers import AllocationModel, get_env
+                with instrumentation.phase("model_build"):
+                    allocation_model = AllocationModel(scenario, get_env(self.quiet), self.quiet, self.instrumentation)
+            return solver(scenario, allocation_model, gap_tolerance=self.gap_tolerance)
+
+        def solve_scenario(name, solver):
+            with instrumentation.phase(f"solve_{name}"):
+                return solver(scenario)
+
+        if self.result_cache is not None:
+            with instrumentation.phase("fingerprint"):
+                fingerprint = scenario_fingerprint(scenario)
+        else:
+            fingerprint = None
+
+        responses = {}
+        for strategy in strategies or DEFAULT_STRATEGIES:
+            entry = solver_entry(strategy)
+            if entry.milp:
+                # Rounded LP answers are cached apart from exact ones
+                key = entry.name if self.gap_tolerance is None else f"{entry.name}:gap_tolerance={self.gap_tolerance}"
+                responses[strategy] = self.solve(scenario, key, lambda: solve_milp(entry.load()), fingerprint)
+            else:
+                responses[strategy] = self.solve(scenario, entry.name, lambda: solve_scenario(entry.name, entry.load()), fingerprint)
+
+        # Simulate survival, averaging num_replications draws per allocation
+        with instrumentation.phase("survival_simulation"):
+            return {
+                strategy: self.expected_survival(scenario, response.allocation, num_replications, rng, uniforms)
+                for strategy, response in responses.items()
+            }
+
+    def solve(self, scenario: ScenarioModel, strategy: str, solve, fingerprint: str = None) -> ICUAllocationResponseModel:
+        if self.result_cache is None:
+            return solve()
+        return self.result_cache.solve(scenario, strategy, solve, fingerprint)
+
+    def expected_survival(self, scenario: ScenarioModel, allocation: dict[int, str], num_replications: int = 1,
+                          rng: np.random.Generator = None, uniforms: np.ndarray = None) -> float:
+        if num_replications > 1:
+            return self.simulate_survival_replications(scenario, allocation, num_replications, rng=rng, uniforms=uniforms).mean
+        return self.simulate_survival(scenario, allocation, rng, uniforms)
+
+    def simulate_survival_replications(self, scenario: ScenarioModel, allocation: dict[int, str], num_replications: int,
+                                       confidence: float = 0.95, rng: np.random.Generator = None,
+                                       uniforms: np.ndarray = None) -> SurvivalEstimateModel:
+        """Survival count of one allocation over num_replications independent draws.
+
+        uniforms, of shape (num_replications, patients), replaces the draws to share them between allocations.
+        """
+        batch = PatientBatch.from_scenario(scenario)
+        allocated = batch.allocation_indices(allocation) >= 0
+
+        # Each uniform below the survival threshold of its patient is a survivor
+        thresholds = np.where(allocated, np.maximum(batch.survival_prob_in_icu, batch.survival_prob_out_icu), batch.survival_prob_out_icu)
+        counts = np.empty(num_replications, dtype=np.int64)
+        if uniforms is not None:
+            counts[:] = (uniforms <= thresholds).sum(axis=1)
+        else:
+            rng = resolve_rng(rng)
+            block_size = max(1, MAX_BLOCK_SIZE // max(len(batch), 1))
+            for start in range(0, num_replications, block_size):
+                stop = min(start + block_size, num_replications)
+                counts[start:stop] = (rng.random((stop - start, len(batch))) <= thresholds).sum(axis=1)
+
+        mean = float(counts.mean())
+        variance = float(counts.var(ddof=1)) if num_replications > 1 else 0.0
+        half_width = NormalDist().inv_cdf((1 + confidence) / 2) * (variance / num_replications) ** 0.5
+        return SurvivalEstimateModel(
+            mean=mean,
+            variance=variance,
+            confidence_interval=(mean - half_width, mean + half_width),
+            confidence=confidence,
+            num_replications=num_replications,
+        )
+
+    def simulate_survival(self, scenario: ScenarioModel, allocation: dict[int, str], rng: np.random.Generator = None,
+                          uniforms: np.ndarray = None) -> int:
+        """Survivors of one draw; uniforms, one per patient, replaces the draw to share it between allocations."""
+        if isinstance(scenario.patients, PatientBatch) or uniforms is not None:
+            batch = PatientBatch.from_scenario(scenario)
+            rand_vals = resolve_rng(rng).random(len(batch)) if uniforms is None else uniforms
+            allocated = batch.allocation_indices(allocation) >= 0
+            survived = (rand_vals <= batch.survival_prob_out_icu) | ((rand_vals <= batch.survival_prob_in_icu) & allocated)
+            return int(survived.sum())
+
         survival_count = 0
         for patient in scenario.patients:
             rand_val = random.uniform(0, 1)
@@ -0,0 +1,69 @@
+import json
+import os
+
+# Log layout: one JSON header line with the sweep configuration, then one line per completed
+# job: {"job": index, "round": round_id, "ratios": [...], "survivals": [{strategy: value}, ...]}
+
+class CheckpointMismatchError(Exception):
+    """Raised when resuming a sweep log written with a different configuration."""
+    pass
+
+def read_checkpoint(path: str) -> tuple[dict, list[dict]]:
+    """Header and job lines of a sweep log, ignoring a partial final line of a running or killed sweep."""
+    with open(path, 'rb') as f:
+        content = f.read()
+    lines = content.split(b"\n")[:-1]  # The text after the last newline is an incomplete line
+    if not lines:
+        return None, []
+    return json.loads(lines[0]), [json.loads(line) for line in lines[1:]]
+
+def checkpoint_results(path: str):
+    """Yield (round, ratio, strategy, survival) rows of a sweep log."""
+    _, jobs = read_checkpoint(path)
+    for job in jobs:
+        for ratio, survival in zip(job["ratios"], job["survivals"]):
+            for strategy, value in survival.items():
+                yield job["round"], ratio, strategy, value
+
+class SweepCheckpoint:
+    """Append-only log of completed sweep jobs, written in batches of flush_every jobs."""
+
+    def __init__(self, path: str, config: dict, flush_every: int = 16):
+        self.path = path
+        self.flush_every = flush_every
+        self._pending = []
+        self.completed = {}
+
+        header, jobs = read_checkpoint(path) if os.path.exists(path) else (None, [])
+        if header is None:
+            self.header = dict(config)
+            self._write([self.header], truncate=True)
+            return
+
+        mismatched = {key for key in config.keys() | header.keys() if config.get(key, header.get(key)) != header.get(key)}
+        if mismatched:
+            raise CheckpointMismatchError(f"{path} was written with different {', '.join(sorted(mismatched))}")
+        self.header = header
+        self.completed = {job["job"]: job for job in jobs}
+        # Drop a torn final line so appends start on a fresh line
+        with open(path, 'rb+') as f:
+            content = f.read()
+            f.truncate(content.rfind(b"\n") + 1)
+
+    def _write(self, lines: list[dict], truncate: bool = False):
+        with open(self.path, 'w' if truncate else 'a') as f:
+            f.write("".join(json.dumps(line, separators=(',', ':')) + "\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record(self, job_index: int, round_id: int, ratios: list[float], survivals: list[dict[str, float]]):
+        job = {"job": job_index, "round": round_id, "ratios": list(ratios), "survivals": survivals}
+        self.completed[job_index] = job
+        self._pending.append(job)
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._write(self._pending)
+            self._pending = []
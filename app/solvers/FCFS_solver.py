@@ -1,6 +1,31 @@
-from app.models import ScenarioModel, ICUAllocationResponseModel
+from app.models import ScenarioModel, ICUAllocationResponseModel, PatientBatch
+import numpy as np
+
+def _columnar_fcfs(scenario: ScenarioModel) -> ICUAllocationResponseModel:
+    batch = scenario.patients
+    icu_types = list(scenario.parameters.icu_capacities.keys())
+    capacities = [max(scenario.parameters.icu_capacities[icu_type], 0) for icu_type in icu_types]
+
+    # Patients in arrival order fill each ICU type in turn
+    admitted = min(len(batch), sum(capacities))
+    icu_type_indices = np.repeat(np.arange(len(icu_types)), capacities)[:admitted]
+    allocation = dict(zip(batch.ids[:admitted].tolist(), [icu_types[t] for t in icu_type_indices.tolist()]))
+
+    daily_costs = np.array([scenario.parameters.daily_costs[icu_type] for icu_type in icu_types], dtype=float)
+    days_of_occupancy = batch.days_of_occupancy_for(icu_types)[np.arange(admitted), icu_type_indices]
+
+    return ICUAllocationResponseModel(
+        id=scenario.id,
+        total_survival_in_icu=float(batch.survival_prob_in_icu[:admitted].sum()),
+        total_survival_out_icu=float(batch.survival_prob_out_icu[admitted:].sum()),
+        total_cost=float((days_of_occupancy * daily_costs[icu_type_indices]).sum()),
+        allocation=allocation
+    )
 
 def FCFSSolver(scenario: ScenarioModel) -> ICUAllocationResponseModel:
+    if isinstance(scenario.patients, PatientBatch):
+        return _columnar_fcfs(scenario)
+
     allocation = {}
     icu_capacities = scenario.parameters.icu_capacities.copy()
 
@@ -28,6 +53,7 @@ def FCFSSolver(scenario: ScenarioModel) -> ICUAllocationResponseModel:
     )
 
     return ICUAllocationResponseModel(
+        id=scenario.id,
         total_survival_in_icu=total_survival_in_icu,
         total_survival_out_icu=total_survival_out_icu,
         total_cost=total_cost,
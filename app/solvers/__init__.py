@@ -1,4 +1,28 @@
-from .MGS_solver import MGSSolver
-from .LSF_solver import LSFSolver
-from .MSF_solver import MSFSolver
-from .FCFS_solver import FCFSSolver
\ No newline at end of file
+from .FCFS_solver import FCFSSolver
+from .combinatorial_solver import CombinatorialSolver
+from .lagrangian_solver import LagrangianSolver
+from .greedy_solver import GreedySolver
+from .admission_policies import AdmissionPolicy, FCFSPolicy, StrategyPolicy
+from .result_cache import SolverResultCache, scenario_fingerprint
+from .registry import register_solver, get_solver, available_solvers, UnknownSolverError
+import importlib
+
+# Names backed by gurobipy, imported on first access so gurobi-free paths never load it
+_LAZY_ATTRIBUTES = {
+    "get_env": ".gurobi_env",
+    "AllocationModel": ".allocation_model",
+    "MGSSolver": ".MGS_solver",
+    "LSFSolver": ".LSF_solver",
+    "MSFSolver": ".MSF_solver",
+    "RollingHorizonSolver": ".rolling_horizon_solver",
+}
+
+def __getattr__( name: str ):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr( importlib.import_module( _LAZY_ATTRIBUTES[name], __name__ ), name )
+        globals(  )[name] = value
+        return value
+    raise AttributeError( f"module {__name__!r} has no attribute {name!r}" )
+
+def __dir__(  ):
+    return sorted( set( globals(  ) ) | set( _LAZY_ATTRIBUTES ) )
@@ -0,0 +1,48 @@
+from app.models import ScenarioModel
+from abc import ABC, abstractmethod
+from .combinatorial_solver import strategy_coefficients, occupancy_gain, EPSILON
+
+class AdmissionPolicy( ABC ):
+    """Decides the ICU type of one arriving patient given the beds currently free."""
+
+    def prepare( self, scenario: ScenarioModel ):
+        pass
+
+    @abstractmethod
+    def choose( self, index: int, free_beds: list[ int ], occupied: int ) -> int:
+        """ICU type index for the patient at row index, or -1 to leave it without a bed."""
+
+class FCFSPolicy( AdmissionPolicy ):
+    # Same rule as FCFSSolver: first ICU type with a free bed
+    def choose( self, index: int, free_beds: list[ int ], occupied: int ) -> int:
+        for t, free in enumerate( free_beds ):
+            if free > 0:
+                return t
+        return -1
+
+class StrategyPolicy( AdmissionPolicy ):
+    """MGS, LSF or MSF objective restricted to a single arrival.
+
+    Admits the patient to the free ICU type of highest value when that value,
+    plus the change of occupancy penalty, improves the objective.
+    """
+
+    def __init__( self, strategy: str ):
+        self.strategy = strategy
+
+    def prepare( self, scenario: ScenarioModel ):
+        values, _, self.theta_coefficient = strategy_coefficients( scenario, self.strategy )
+        self.rows = values.tolist(  )
+        self.total_capacity = sum( scenario.parameters.icu_capacities.values(  ) )
+        self.ideal_occupancy_rate = scenario.parameters.ideal_occupancy_rate
+
+    def choose( self, index: int, free_beds: list[ int ], occupied: int ) -> int:
+        # A rewarded theta makes the strategy unbounded, as in the static model nobody is admitted
+        if self.theta_coefficient > 0 or occupied >= self.total_capacity:
+            return -1
+        gain = occupancy_gain( occupied, self.total_capacity, self.ideal_occupancy_rate, self.theta_coefficient )
+        best, best_value = -1, EPSILON
+        for t, value in enumerate( self.rows[index] ):
+            if free_beds[t] > 0 and value + gain > best_value:
+                best, best_value = t, value + gain
+        return best
@@ -0,0 +1,192 @@
+from app.models import ScenarioModel, ICUAllocationResponseModel, PatientBatch
+from app.instrumentation import NULL_INSTRUMENTATION
+from .gurobi_env import get_env
+from gurobipy import Env, Model, GRB, quicksum
+import numpy as np
+
+# Objective of each strategy: ( include survival outside the ICU, optimization sense )
+STRATEGY_OBJECTIVES = {
+    "MGS": ( True, GRB.MAXIMIZE ),
+    "LSF": ( False, GRB.MAXIMIZE ),
+    "MSF": ( False, GRB.MINIMIZE ),
+}
+
+class AllocationModel:
+    """Constraint system of a scenario, built once and re-optimized per strategy."""
+
+    def __init__( self, scenario: ScenarioModel, env: Env = None, quiet: bool = False, instrumentation = None ):
+        # Quiet mode: pooled silent environment, no solver log and no variable or constraint names
+        if env is None and quiet:
+            env = get_env( quiet = True )
+        self.scenario = scenario
+        self.instrumentation = instrumentation or NULL_INSTRUMENTATION
+        self.model = Model( env = env )
+        if quiet:
+            self.model.Params.OutputFlag = 0
+        named = not quiet
+        self.allocation = {}
+
+        patients = PatientBatch.from_scenario( scenario )
+        params = scenario.parameters
+        icu_types = list( params.icu_capacities.keys(  ) )
+        self.patients = patients
+        self.icu_types = icu_types
+
+        ids = patients.ids.tolist(  )
+        survival_prob_in_icu = patients.survival_prob_in_icu.tolist(  )
+        survival_prob_out_icu = patients.survival_prob_out_icu.tolist(  )
+        days_of_occupancy = patients.days_of_occupancy_for( icu_types ).tolist(  )
+
+        # Decision variables
+        self.x = x = {
+            ( p_id, icu_type ): self.model.addVar( vtype = GRB.BINARY, name = f"x_{p_id}_{icu_type}" if named else "" )
+            for p_id in ids for icu_type in icu_types
+        }
+
+        self.theta = theta = self.model.addVar( lb = 0, vtype = GRB.CONTINUOUS, name = "theta" if named else "" )
+
+        # Constraints
+        for icu_type in icu_types:
+            self.model.addConstr(
+                quicksum( x[p_id, icu_type] for p_id in ids ) <= params.icu_capacities[icu_type],
+                name = f"capacity_{icu_type}" if named else ""
+             )
+
+        for p_id in ids:
+            self.model.addConstr(
+                quicksum( x[p_id, icu_type] for icu_type in icu_types ) <= 1,
+                name = f"one_allocation_{p_id}" if named else ""
+             )
+
+        # Penalty for occupancy deviation
+        total_allocated = quicksum( x.values(  ) )
+        total_capacity = sum( params.icu_capacities.values(  ) )
+        self.model.addConstr( ( total_allocated / total_capacity - params.ideal_occupancy_rate ) + theta >= 0, "occupancy_penalty" if named else "" )
+
+        # Objective function components
+        self.survival_in_icu = quicksum( x[p_id, icu_type] * p_in for p_id, p_in in zip( ids, survival_prob_in_icu ) for icu_type in icu_types )
+        self.survival_out_icu = quicksum( ( 1 - quicksum( x[p_id, icu_type] for icu_type in icu_types ) ) * p_out for p_id, p_out in zip( ids, survival_prob_out_icu ) )
+        self.occupancy_penalty = params.penalty_multiplier * theta
+        self.cost = quicksum(
+            x[p_id, icu_type] * days * params.daily_costs[icu_type]
+            for p_id, row in zip( ids, days_of_occupancy ) for icu_type, days in zip( icu_types, row )
+         )
+
+    def optimize( self, strategy: str ):
+        include_survival_out_icu, sense = STRATEGY_OBJECTIVES[strategy]
+
+        objective = self.survival_in_icu - self.occupancy_penalty - self.cost
+        if include_survival_out_icu:
+            objective += self.survival_out_icu
+        self.model.setObjective( objective, sense )
+
+        # Warm start from the allocation found by the previous strategy
+        if self.allocation:
+            starts = [ 1.0 if self.allocation.get( patient_id ) == icu_type else 0.0 for patient_id, icu_type in self.x.keys(  ) ]
+            self.model.setAttr( "Start", list( self.x.values(  ) ), starts )
+
+        self.model.optimize(  )
+
+    def extract( self ):
+        allocation = {}
+        if self.model.status == GRB.OPTIMAL:
+            values = self.model.getAttr( "X", list( self.x.values(  ) ) )
+            for ( patient_id, icu_type ), value in zip( self.x.keys(  ), values ):
+                if value > 0.5:
+                    allocation[patient_id] = icu_type
+        self.allocation = allocation
+
+    def response( self ) -> ICUAllocationResponseModel:
+        objective = bound = gap = None
+        if self.model.status == GRB.OPTIMAL:
+            total_survival_in_icu = self.survival_in_icu.getValue(  )
+            total_survival_out_icu = self.survival_out_icu.getValue(  )
+            total_cost = self.cost.getValue(  )
+            objective, bound, gap = self.model.ObjVal, self.model.ObjBound, self.model.MIPGap
+        else:
+            # No allocation: every patient stays outside the ICU
+            total_survival_in_icu = 0
+            total_survival_out_icu = float( self.patients.survival_prob_out_icu.sum(  ) )
+            total_cost = 0
+
+        return ICUAllocationResponseModel(
+            id=self.scenario.id,
+            total_survival_in_icu=total_survival_in_icu,
+            total_survival_out_icu=total_survival_out_icu,
+            total_cost=total_cost,
+            allocation=self.allocation,
+            objective=objective,
+            bound=bound,
+            gap=gap
+         )
+
+    def round_relaxation( self, values: np.ndarray, coefficients: np.ndarray ) -> np.ndarray:
+        """ICU type index per patient ( -1 when not admitted ) from ( patients x ICU types ) LP values.
+
+        Admits every patient whose LP value for a type exceeds 1/2, dropping those with the
+        smallest values, then the least valuable objective coefficients, where a type is over capacity.
+        """
+        sign = -self.model.ModelSense  # +1 when maximizing
+        assigned = np.full( values.shape[0], -1 )
+        for t, icu_type in enumerate( self.icu_types ):
+            candidates = np.flatnonzero( values[:, t] > 0.5 )
+            order = np.lexsort( ( -sign * coefficients[candidates, t], -values[candidates, t] ) )
+            assigned[candidates[order[:self.scenario.parameters.icu_capacities[icu_type]]]] = t
+        return assigned
+
+    def solve_relaxed( self, strategy: str, gap_tolerance: float ) -> ICUAllocationResponseModel:
+        """LP relaxation rounded to a feasible allocation, reporting its gap to the LP bound.
+
+        The MILP is solved instead ( warm-started from the rounding ) when that gap exceeds gap_tolerance.
+        """
+        variables = list( self.x.values(  ) )
+        self.model.setAttr( "VType", variables, [ GRB.CONTINUOUS ] * len( variables ) )
+        with self.instrumentation.phase( f"relax_{strategy}" ):
+            self.optimize( strategy )
+        self.instrumentation.record_model( f"{strategy}_LP", self.model )
+
+        if self.model.status != GRB.OPTIMAL:
+            self.model.setAttr( "VType", variables, [ GRB.BINARY ] * len( variables ) )
+            return self.solve( strategy )
+
+        with self.instrumentation.phase( f"round_{strategy}" ):
+            shape = ( len( self.patients ), len( self.icu_types ) )
+            values = np.array( self.model.getAttr( "X", variables ) ).reshape( shape )
+            coefficients = np.array( self.model.getAttr( "Obj", variables ) ).reshape( shape )
+            bound = self.model.ObjVal
+            theta_coefficient, constant = self.theta.Obj, self.model.ObjCon
+            self.model.setAttr( "VType", variables, [ GRB.BINARY ] * len( variables ) )
+
+            assigned = self.round_relaxation( values, coefficients )
+            admitted = assigned >= 0
+            params = self.scenario.parameters
+            theta = max( 0.0, params.ideal_occupancy_rate - admitted.sum(  ) / sum( params.icu_capacities.values(  ) ) )
+            objective = constant + coefficients[admitted, assigned[admitted]].sum(  ) + theta_coefficient * theta
+            gap = abs( bound - objective ) / max( abs( objective ), 1e-10 )
+
+            ids = self.patients.ids[admitted].tolist(  )
+            self.allocation = dict( zip( ids, ( self.icu_types[t] for t in assigned[admitted].tolist(  ) ) ) )
+
+        if gap > gap_tolerance:
+            return self.solve( strategy )
+
+        days_of_occupancy = self.patients.days_of_occupancy_for( self.icu_types )
+        daily_costs = np.array( [ params.daily_costs[icu_type] for icu_type in self.icu_types ] )
+        return ICUAllocationResponseModel(
+            id=self.scenario.id,
+            total_survival_in_icu=float( self.patients.survival_prob_in_icu[admitted].sum(  ) ),
+            total_survival_out_icu=float( self.patients.survival_prob_out_icu[~admitted].sum(  ) ),
+            total_cost=float( ( days_of_occupancy[admitted, assigned[admitted]] * daily_costs[assigned[admitted]] ).sum(  ) ),
+            allocation=self.allocation,
+            objective=float( objective ),
+            bound=bound,
+            gap=gap
+         )
+
+    def solve( self, strategy: str ) -> ICUAllocationResponseModel:
+        with self.instrumentation.phase( f"optimize_{strategy}" ):
+            self.optimize( strategy )
+        self.instrumentation.record_model( strategy, self.model )
+        with self.instrumentation.phase( f"extract_{strategy}" ):
+            self.extract(  )
+            return self.response(  )
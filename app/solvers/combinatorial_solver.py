@@ -0,0 +1,182 @@
+from app.models import ScenarioModel, ICUAllocationResponseModel, PatientBatch
+import heapq
+import numpy as np
+
+EPSILON = 1e-12
+# Strategies whose objective strategy_coefficients negates
+MINIMIZED_STRATEGIES = ( "MSF", )
+
+def strategy_coefficients( scenario: ScenarioModel, strategy: str ):
+    """Objective of a strategy in maximization form.
+
+    Returns the ( patients x ICU types ) value of each admission, the objective
+    constant and the coefficient of the occupancy penalty variable theta.
+    """
+    patients = PatientBatch.from_scenario( scenario )
+    params = scenario.parameters
+    icu_types = list( params.icu_capacities.keys(  ) )
+
+    survival_in_icu = patients.survival_prob_in_icu.astype( float )
+    survival_out_icu = patients.survival_prob_out_icu.astype( float )
+    cost = patients.days_of_occupancy_for( icu_types ) * np.array( [ params.daily_costs[icu_type] for icu_type in icu_types ], dtype = float )
+
+    if strategy == "MGS":
+        return survival_in_icu[:, None] - survival_out_icu[:, None] - cost, survival_out_icu.sum(  ), -params.penalty_multiplier
+    if strategy == "LSF":
+        return survival_in_icu[:, None] - cost, 0.0, -params.penalty_multiplier
+    if strategy == "MSF":
+        # Minimizing survival_in - penalty - cost is maximizing its negation
+        return cost - survival_in_icu[:, None], 0.0, params.penalty_multiplier
+    raise ValueError( f"Unknown allocation strategy {strategy}" )
+
+def occupancy_term( admitted: int, total_capacity: int, ideal_occupancy_rate: float, theta_coefficient: float ) -> float:
+    # Objective contribution theta_coefficient * theta of admitting the given number of patients
+    if total_capacity <= 0:
+        return 0.0
+    return theta_coefficient * max( 0.0, ideal_occupancy_rate - admitted / total_capacity )
+
+def assignment_response( scenario: ScenarioModel, strategy: str, solve ) -> ICUAllocationResponseModel:
+    """Response of a MILP strategy allocated by solve( values, capacities, theta_coefficient, constant ).
+
+    solve gets the strategy_coefficients and the ICU capacities, and returns the ICU type index
+    of each patient ( -1 when not admitted ) and an upper bound on the objective in maximization
+    form, or None. The objective is evaluated here and reported in the strategy's own sense.
+    """
+    patients = PatientBatch.from_scenario( scenario )
+    params = scenario.parameters
+    icu_types = list( params.icu_capacities.keys(  ) )
+    capacities = [ params.icu_capacities[icu_type] for icu_type in icu_types ]
+
+    values, constant, theta_coefficient = strategy_coefficients( scenario, strategy )
+
+    assigned = np.full( len( patients ), -1 )
+    objective = bound = gap = None
+    # A rewarded theta has no upper bound, so the model is unbounded and nothing is allocated
+    if theta_coefficient <= 0:
+        assigned, bound = solve( values, capacities, theta_coefficient, constant )
+        admitted = assigned >= 0
+        objective = float( constant + values[admitted, assigned[admitted]].sum(  )
+                           + occupancy_term( int( admitted.sum(  ) ), sum( capacities ), params.ideal_occupancy_rate, theta_coefficient ) )
+        if bound is not None:
+            gap = abs( bound - objective ) / max( abs( objective ), 1e-10 )
+        if strategy in MINIMIZED_STRATEGIES:
+            objective, bound = -objective, None if bound is None else -bound
+
+    admitted = np.flatnonzero( assigned >= 0 )
+    allocation = dict( zip( patients.ids[admitted].tolist(  ), [ icu_types[t] for t in assigned[admitted].tolist(  ) ] ) )
+    daily_costs = np.array( [ params.daily_costs[icu_type] for icu_type in icu_types ], dtype = float )
+    days_of_occupancy = patients.days_of_occupancy_for( icu_types )[admitted, assigned[admitted]]
+
+    return ICUAllocationResponseModel(
+        id=scenario.id,
+        total_survival_in_icu=float( patients.survival_prob_in_icu[admitted].sum(  ) ),
+        total_survival_out_icu=float( patients.survival_prob_out_icu[assigned < 0].sum(  ) ),
+        total_cost=float( ( days_of_occupancy * daily_costs[assigned[admitted]] ).sum(  ) ),
+        allocation=allocation,
+        objective=objective,
+        bound=bound,
+        gap=gap
+     )
+
+def occupancy_gain( admitted: int, total_capacity: int, ideal_occupancy_rate: float, theta_coefficient: float ) -> float:
+    # Change of theta_coefficient * max( 0, ideal - admitted / capacity ) when one more patient is admitted
+    before = max( 0.0, ideal_occupancy_rate - admitted / total_capacity )
+    after = max( 0.0, ideal_occupancy_rate - ( admitted + 1 ) / total_capacity )
+    return theta_coefficient * ( after - before )
+
+def _top( heap: list, is_valid ):
+    # Discard stale entries of a lazily maintained heap
+    while heap and not is_valid( heap[0][1] ):
+        heapq.heappop( heap )
+    return heap[0] if heap else None
+
+def solve_assignment( values: np.ndarray, capacities: list[ int ], ideal_occupancy_rate: float, theta_coefficient: float ) -> np.ndarray:
+    """Exact allocation by successive longest augmenting paths.
+
+    Each augmentation admits one more patient, possibly moving admitted
+    patients between ICU types, and yields the best allocation for that number
+    of admissions. Those values are concave in the number of admissions, as is
+    the occupancy penalty, so the sweep stops at the first non-improving step.
+    Returns the ICU type index of each patient, or -1 when not admitted.
+    """
+    num_types = values.shape[1]
+    total_capacity = sum( capacities )
+    result = np.full( values.shape[0], -1 )
+
+    # Only the best total_capacity patients of some ICU type can be part of an optimal allocation
+    candidates = np.arange( values.shape[0] )
+    if 0 < total_capacity < values.shape[0]:
+        keep = np.zeros( values.shape[0], dtype = bool )
+        for t in range( num_types ):
+            keep[np.argpartition( -values[:, t], total_capacity - 1 )[:total_capacity]] = True
+        candidates = np.flatnonzero( keep )
+
+    num_patients = len( candidates )
+    rows = values[candidates].tolist(  )
+    assigned = [ -1 ] * num_patients
+    used = [ 0 ] * num_types
+
+    # Unassigned patients by value per type, admitted patients by gain of moving between types
+    enter_heaps = [ [ ( -rows[p][t], p ) for p in range( num_patients ) ] for t in range( num_types ) ]
+    for heap in enter_heaps:
+        heapq.heapify( heap )
+    move_heaps = { ( a, b ): [] for a in range( num_types ) for b in range( num_types ) if a != b }
+
+    def place( p: int, t: int ):
+        assigned[p] = t
+        row = rows[p]
+        for other in range( num_types ):
+            if other != t:
+                heapq.heappush( move_heaps[t, other], ( row[t] - row[other], p ) )
+
+    admitted = 0
+    while admitted < total_capacity:
+        # Longest path from the source to every ICU type ( Bellman-Ford on the type graph )
+        dist = [ None ] * num_types
+        pred = [ None ] * num_types
+        for t in range( num_types ):
+            top = _top( enter_heaps[t], lambda p: assigned[p] == -1 )
+            if top is not None:
+                dist[t] = -top[0]
+                pred[t] = ( None, top[1] )
+        for _ in range( num_types - 1 ):
+            changed = False
+            for ( a, b ), heap in move_heaps.items(  ):
+                if dist[a] is None:
+                    continue
+                top = _top( heap, lambda p, a=a: assigned[p] == a )
+                if top is not None and ( dist[b] is None or dist[a] - top[0] > dist[b] + EPSILON ):
+                    dist[b] = dist[a] - top[0]
+                    pred[b] = ( a, top[1] )
+                    changed = True
+            if not changed:
+                break
+
+        end = None
+        for t in range( num_types ):
+            if used[t] < capacities[t] and dist[t] is not None and ( end is None or dist[t] > dist[end] ):
+                end = t
+        if end is None:
+            break
+        if dist[end] + occupancy_gain( admitted, total_capacity, ideal_occupancy_rate, theta_coefficient ) <= EPSILON:
+            break
+
+        # Augment along the path: each step moves one patient into type t
+        t = end
+        for _ in range( num_types ):
+            origin, p = pred[t]
+            place( p, t )
+            if origin is None:
+                break
+            t = origin
+        used[end] += 1
+        admitted += 1
+
+    result[candidates] = assigned
+    return result
+
+def CombinatorialSolver( scenario: ScenarioModel, strategy: str = "MGS" ) -> ICUAllocationResponseModel:
+    def solve( values, capacities, theta_coefficient, constant ):
+        return solve_assignment( values, capacities, scenario.parameters.ideal_occupancy_rate, theta_coefficient ), None
+
+    return assignment_response( scenario, strategy, solve )
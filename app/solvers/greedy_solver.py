@@ -0,0 +1,56 @@
+from app.models import ScenarioModel, ICUAllocationResponseModel, PatientBatch
+from .combinatorial_solver import assignment_response, occupancy_gain
+import numpy as np
+
+def greedy_assignment( values: np.ndarray, priorities: np.ndarray, capacities: list[ int ], ideal_occupancy_rate: float,
+                       theta_coefficient: float ) -> np.ndarray:
+    """Admit ( patient, ICU type ) pairs by decreasing value, ties broken by priority.
+
+    Stops when every bed is taken or the next admission no longer improves the
+    objective, occupancy penalty included. Returns the ICU type index of each
+    patient, or -1 when not admitted.
+    """
+    num_patients, num_types = values.shape
+    total_capacity = sum( capacities )
+    assigned = np.full( num_patients, -1 )
+    if total_capacity <= 0:
+        return assigned
+
+    # A pair below the best total_capacity of its ICU type is only reached once all beds are taken;
+    # pairs tied with the last of those are kept for the priority tie-break
+    candidates, types = [], []
+    for t in range( num_types ):
+        column = np.arange( num_patients )
+        if total_capacity < num_patients:
+            threshold = np.partition( values[:, t], num_patients - total_capacity )[num_patients - total_capacity]
+            column = np.flatnonzero( values[:, t] >= threshold )
+        candidates.append( column )
+        types.append( np.full( len( column ), t ) )
+    candidates, types = np.concatenate( candidates ), np.concatenate( types )
+
+    # Pairs in the order a heap keyed by ( -value, -priority ) would pop them, sorted in one pass
+    pair_values = values[candidates, types]
+    order = np.lexsort( ( -priorities[candidates], -pair_values ) )
+
+    remaining = list( capacities )
+    admitted = 0
+    for value, p, t in zip( pair_values[order].tolist(  ), candidates[order].tolist(  ), types[order].tolist(  ) ):
+        if assigned[p] >= 0 or remaining[t] <= 0:
+            continue
+        if value + occupancy_gain( admitted, total_capacity, ideal_occupancy_rate, theta_coefficient ) <= 0:
+            break
+        assigned[p] = t
+        remaining[t] -= 1
+        admitted += 1
+        if admitted == total_capacity:
+            break
+    return assigned
+
+def GreedySolver( scenario: ScenarioModel, strategy: str = "MGS" ) -> ICUAllocationResponseModel:
+    """Marginal-benefit heuristic on the objective of a MILP strategy, in O( n log n ) without Gurobi."""
+    def solve( values, capacities, theta_coefficient, constant ):
+        priorities = PatientBatch.from_scenario( scenario ).burn_priority_icu
+        capacities = [ max( capacity, 0 ) for capacity in capacities ]
+        return greedy_assignment( values, priorities, capacities, scenario.parameters.ideal_occupancy_rate, theta_coefficient ), None
+
+    return assignment_response( scenario, strategy, solve )
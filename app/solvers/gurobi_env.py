@@ -0,0 +1,20 @@
+from gurobipy import Env
+import os
+
+# Environments created by the current process, keyed by ( pid, quiet )
+_environments = {}
+
+def get_env( quiet: bool = True ) -> Env:
+    """Reusable Gurobi environment of the current process, started once.
+
+    Keyed by process id so forked workers never share their parent's environment.
+    """
+    key = ( os.getpid(  ), quiet )
+    env = _environments.get( key )
+    if env is None:
+        env = Env( empty = True )
+        if quiet:
+            env.setParam( "OutputFlag", 0 )
+        env.start(  )
+        _environments[key] = env
+    return env
@@ -0,0 +1,120 @@
+from app.models import ScenarioModel, ICUAllocationResponseModel
+from .combinatorial_solver import assignment_response, occupancy_term
+import numpy as np
+
+def _subproblem( values: np.ndarray, multipliers: np.ndarray, admission_reward: float ):
+    # Best ICU type of every patient at the given prices, -1 when no type has positive reduced value
+    best = np.full( values.shape[0], -np.inf )
+    choice = np.full( values.shape[0], -1 )
+    for t in range( values.shape[1] ):
+        reduced = values[:, t] - multipliers[t] + admission_reward
+        better = reduced > best
+        best[better] = reduced[better]
+        choice[better] = t
+    choice[best <= 0] = -1
+    return choice, np.maximum( best, 0.0 ).sum(  )
+
+def repair( values: np.ndarray, choice: np.ndarray, capacities: np.ndarray, ideal_occupancy_rate: float, theta_coefficient: float ) -> np.ndarray:
+    """Feasible allocation from a subproblem solution.
+
+    Over-capacity ICU types keep their most valuable patients; spare beds are then
+    filled with the most valuable unassigned patients while admitting them still
+    improves the objective, occupancy penalty included.
+    """
+    assigned = choice.copy(  )
+    total_capacity = int( capacities.sum(  ) )
+    for t in range( values.shape[1] ):
+        members = np.flatnonzero( assigned == t )
+        if len( members ) > capacities[t]:
+            order = np.argsort( -values[members, t], kind = "stable" )
+            assigned[members[order[capacities[t]:]]] = -1
+
+    admitted = int( ( assigned >= 0 ).sum(  ) )
+    for t in np.argsort( -capacities, kind = "stable" ):
+        spare = int( capacities[t] - ( assigned == t ).sum(  ) )
+        unassigned = np.flatnonzero( assigned < 0 )
+        if spare <= 0 or len( unassigned ) == 0:
+            continue
+        spare = min( spare, len( unassigned ) )
+        top = unassigned[np.argpartition( -values[unassigned, t], spare - 1 )[:spare]]
+        top = top[np.argsort( -values[top, t], kind = "stable" )]
+
+        # Values are decreasing and so are the occupancy gains, so the improving admissions are a prefix
+        counts = admitted + np.arange( len( top ) )
+        gains = theta_coefficient * (
+            np.maximum( 0.0, ideal_occupancy_rate - ( counts + 1 ) / total_capacity )
+            - np.maximum( 0.0, ideal_occupancy_rate - counts / total_capacity )
+        )
+        improving = values[top, t] + gains > 0
+        take = len( top ) if improving.all(  ) else int( np.argmin( improving ) )
+        assigned[top[:take]] = t
+        admitted += take
+    return assigned
+
+def solve_lagrangian( values: np.ndarray, capacities: list[ int ], ideal_occupancy_rate: float, theta_coefficient: float,
+                      constant: float = 0.0, max_iterations: int = 200, gap_tolerance: float = 1e-4, repair_every: int = 10 ):
+    """Lagrangian relaxation of the capacity and occupancy constraints ( maximization form ).
+
+    Prices lambda per ICU type and a reward mu per admission, 0 <= mu <= -theta_coefficient / total
+    capacity, decouple the patients. The dual is minimized by subgradient steps of Polyak length
+    towards the best repaired allocation. Returns the ICU type index of each patient ( -1 when not
+    admitted ), its objective and the best upper bound.
+    """
+    capacities = np.asarray( capacities, dtype = np.int64 )
+    total_capacity = int( capacities.sum(  ) )
+    num_patients, num_types = values.shape
+    max_reward = -theta_coefficient / total_capacity if total_capacity > 0 else 0.0
+
+    multipliers = np.zeros( num_types )
+    admission_reward = 0.0
+    step_scale = 2.0
+    stalled = 0
+    best_assigned = np.full( num_patients, -1 )
+    best_objective = constant + occupancy_term( 0, total_capacity, ideal_occupancy_rate, theta_coefficient )
+    bound = np.inf
+
+    for iteration in range( max_iterations ):
+        choice, reduced_total = _subproblem( values, multipliers, admission_reward )
+        dual = ( constant + reduced_total + multipliers @ capacities
+                 - admission_reward * ideal_occupancy_rate * total_capacity )
+        if dual < bound - 1e-12:
+            bound, stalled = dual, 0
+        else:
+            stalled += 1
+            if stalled >= 5:
+                step_scale, stalled = step_scale / 2, 0
+
+        if iteration % repair_every == 0 or iteration == max_iterations - 1:
+            assigned = repair( values, choice, capacities, ideal_occupancy_rate, theta_coefficient )
+            admitted = assigned >= 0
+            objective = ( constant + values[admitted, assigned[admitted]].sum(  )
+                          + occupancy_term( int( admitted.sum(  ) ), total_capacity, ideal_occupancy_rate, theta_coefficient ) )
+            if objective > best_objective:
+                best_assigned, best_objective = assigned, objective
+        if bound - best_objective <= gap_tolerance * max( abs( best_objective ), 1e-10 ):
+            break
+
+        # Subgradients of the dual function
+        counts = np.bincount( choice[choice >= 0], minlength = num_types )
+        capacity_gradient = capacities - counts
+        occupancy_gradient = ( choice >= 0 ).sum(  ) - ideal_occupancy_rate * total_capacity
+        norm = capacity_gradient @ capacity_gradient + ( occupancy_gradient ** 2 if max_reward > 0 else 0.0 )
+        if norm == 0 or step_scale < 1e-8:
+            break
+        step = step_scale * ( dual - best_objective ) / norm
+        multipliers = np.maximum( 0.0, multipliers - step * capacity_gradient )
+        admission_reward = min( max_reward, max( 0.0, admission_reward - step * occupancy_gradient ) )
+
+    return best_assigned, float( best_objective ), float( bound )
+
+def LagrangianSolver( scenario: ScenarioModel, strategy: str = "MGS", max_iterations: int = 200, gap_tolerance: float = 1e-4,
+                      repair_every: int = 10 ) -> ICUAllocationResponseModel:
+    """Feasible allocation and objective bound without a MILP, for scenarios too large to model in gurobipy."""
+    def solve( values, capacities, theta_coefficient, constant ):
+        assigned, _, bound = solve_lagrangian(
+            values, capacities, scenario.parameters.ideal_occupancy_rate, theta_coefficient, constant,
+            max_iterations, gap_tolerance, repair_every
+        )
+        return assigned, bound
+
+    return assignment_response( scenario, strategy, solve )
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+from functools import partial
+import importlib
+
+@dataclass
+class SolverEntry:
+    """A named allocation strategy whose solver is imported on first use.
+
+    solver is a callable or a "module:attribute" path. MILP solvers are called as
+    solver( scenario, allocation_model, gap_tolerance = ... ) on a shared AllocationModel,
+    the others as solver( scenario ); with an objective, as solver( scenario, strategy = objective ).
+    """
+    name: str
+    solver: object
+    milp: bool = False
+    objective: str = None  # MILP strategy whose objective a non-MILP solver optimizes
+
+    def load( self ):
+        if isinstance( self.solver, str ):
+            module_name, attribute = self.solver.split( ":" )
+            self.solver = getattr( importlib.import_module( module_name ), attribute )
+        if self.objective is not None:
+            return partial( self.solver, strategy = self.objective )
+        return self.solver
+
+class UnknownSolverError(KeyError):
+    """Raised when a strategy name is not registered."""
+    pass
+
+_SOLVERS: dict[ str, SolverEntry ] = {}
+_ALIASES: dict[ str, str ] = {}
+
+def register_solver( name: str, solver, milp: bool = False, aliases: tuple[ str, ... ] = (  ), objective: str = None ):
+    """Register ( or replace ) the solver of a strategy name."""
+    _SOLVERS[name] = SolverEntry( name, solver, milp, objective )
+    for alias in aliases:
+        _ALIASES[alias] = name
+
+def solver_entry( name: str ) -> SolverEntry:
+    try:
+        return _SOLVERS[_ALIASES.get( name, name )]
+    except KeyError:
+        raise UnknownSolverError( f"Unknown solver {name!r}, expected one of {available_solvers(  )}" ) from None
+
+def get_solver( name: str ):
+    return solver_entry( name ).load(  )
+
+def available_solvers(  ) -> list[ str ]:
+    return sorted( _SOLVERS )
+
+register_solver( "MGS", "app.solvers.MGS_solver:MGSSolver", milp = True, aliases = ( "MSG", ) )
+register_solver( "LSF", "app.solvers.LSF_solver:LSFSolver", milp = True )
+register_solver( "MSF", "app.solvers.MSF_solver:MSFSolver", milp = True )
+register_solver( "FCFS", "app.solvers.FCFS_solver:FCFSSolver" )
+# Gurobi-free solvers of the MILP objectives: NAME optimizes MGS, NAME_LSF and NAME_MSF the other two
+for name, solver in (
+    ( "GREEDY", "app.solvers.greedy_solver:GreedySolver" ),
+    ( "COMBINATORIAL", "app.solvers.combinatorial_solver:CombinatorialSolver" ),
+    ( "LAGRANGIAN", "app.solvers.lagrangian_solver:LagrangianSolver" ),
+):
+    register_solver( name, solver, objective = "MGS" )
+    for objective in ( "LSF", "MSF" ):
+        register_solver( f"{name}_{objective}", solver, objective = objective )
@@ -0,0 +1,117 @@
+from app.models import ScenarioModel, ICUAllocationResponseModel, PatientBatch
+from collections import OrderedDict
+from dataclasses import asdict, replace
+import hashlib
+import json
+import os
+import numpy as np
+
+# Patient columns hashed by scenario_fingerprint, with the dtype they are normalized to
+FINGERPRINT_COLUMNS = {
+    "ids": np.int64,
+    "sofa_scores": np.int8,
+    "survival_prob_in_icu": np.float64,
+    "survival_prob_out_icu": np.float64,
+    "days_of_occupancy": np.int64,
+    "is_burn_patient": np.bool_,
+    "burn_priority_icu": np.int8,
+    "burn_priority_non_icu": np.int8,
+}
+
+def scenario_fingerprint( scenario: ScenarioModel ) -> str:
+    """Stable hash of the parameter values and patient data of a scenario ( ids of the scenario and parameters excluded )."""
+    batch = PatientBatch.from_scenario( scenario )
+    parameters = asdict( scenario.parameters )
+    parameters.pop( "id" )
+
+    digest = hashlib.sha256(  )
+    digest.update( json.dumps( [ list( batch.icu_types ), parameters ], sort_keys = True, default = str ).encode(  ) )
+    for name, dtype in FINGERPRINT_COLUMNS.items(  ):
+        column = np.ascontiguousarray( getattr( batch, name ), dtype = dtype )
+        digest.update( f"{name}{column.shape}".encode(  ) )
+        digest.update( column.tobytes(  ) )
+    return digest.hexdigest(  )
+
+def result_key( fingerprint: str, strategy: str ) -> str:
+    return hashlib.sha256( f"{fingerprint}:{strategy}".encode(  ) ).hexdigest(  )
+
+class SolverResultCache:
+    """Solver responses keyed by scenario fingerprint and strategy, in an LRU tier and an optional directory."""
+
+    def __init__( self, maxsize: int = 1024, directory: str = None ):
+        self.maxsize = maxsize
+        self.directory = directory
+        self._responses = OrderedDict(  )
+        self.hits = 0
+        self.misses = 0
+        self._journal = None  # Keys stored since track_changes, e.g. by a copy in a worker process
+        self._baseline = ( 0, 0 )
+        if directory is not None:
+            os.makedirs( directory, exist_ok = True )
+
+    def _path( self, key: str ) -> str:
+        return os.path.join( self.directory, f"{key}.json" )
+
+    def get( self, key: str ) -> ICUAllocationResponseModel:
+        response = self._responses.get( key )
+        if response is not None:
+            self._responses.move_to_end( key )
+            return response
+        if self.directory is not None and os.path.exists( self._path( key ) ):
+            with open( self._path( key ), 'r' ) as f:
+                data = json.load( f )
+            data["allocation"] = { int( patient_id ): icu_type for patient_id, icu_type in data["allocation"].items(  ) }
+            response = ICUAllocationResponseModel( **data )
+            self._remember( key, response )
+            return response
+        return None
+
+    def put( self, key: str, response: ICUAllocationResponseModel ):
+        self._remember( key, response )
+        if self._journal is not None:
+            self._journal.append( key )
+        if self.directory is not None:
+            temp_path = f"{self._path( key )}.{os.getpid(  )}.tmp"
+            with open( temp_path, 'w' ) as f:
+                json.dump( asdict( response ), f )
+            os.replace( temp_path, self._path( key ) )
+
+    def track_changes( self ):
+        """Start recording the hits, misses and stored responses reported by changes(  )."""
+        self._baseline = ( self.hits, self.misses )
+        self._journal = []
+
+    def changes( self ) -> dict:
+        """Hits, misses and responses since track_changes, for merge(  ) into the cache this one is a copy of."""
+        responses = [ ( key, self._responses[key] ) for key in self._journal if key in self._responses ]
+        return { "hits": self.hits - self._baseline[0], "misses": self.misses - self._baseline[1], "responses": responses }
+
+    def merge( self, changes: dict ):
+        self.hits += changes["hits"]
+        self.misses += changes["misses"]
+        # Responses are already in the directory, written by the copy that solved them
+        for key, response in changes["responses"]:
+            self._remember( key, response )
+
+    def _remember( self, key: str, response: ICUAllocationResponseModel ):
+        self._responses[key] = response
+        self._responses.move_to_end( key )
+        while len( self._responses ) > self.maxsize:
+            self._responses.popitem( last = False )
+
+    def solve( self, scenario: ScenarioModel, strategy: str, solve, fingerprint: str = None ) -> ICUAllocationResponseModel:
+        """Cached response of strategy on scenario, calling solve() only on a miss.
+
+        Pass the scenario_fingerprint when solving several strategies on one scenario to hash it once.
+        """
+        if fingerprint is None:
+            fingerprint = scenario_fingerprint( scenario )
+        key = result_key( fingerprint, strategy )
+        response = self.get( key )
+        if response is None:
+            self.misses += 1
+            response = solve(  )
+            self.put( key, response )
+        else:
+            self.hits += 1
+        return replace( response, id = scenario.id, allocation = dict( response.allocation ) )
@@ -0,0 +1,122 @@
+from app.models import ScenarioModel, ICUAllocationResponseModel, PatientBatch
+from .allocation_model import STRATEGY_OBJECTIVES
+from .gurobi_env import get_env
+from gurobipy import Env, Model, GRB, quicksum
+import numpy as np
+
+def RollingHorizonSolver( daily_scenarios: list[ ScenarioModel ], horizon: int = 7, strategy: str = "MGS", max_wait: int = 0,
+                          env: Env = None, quiet: bool = True ) -> list[ ICUAllocationResponseModel ]:
+    """Multi-day allocation where admitted patients hold their bed for days_of_occupancy days.
+
+    daily_scenarios[d] holds the patients arriving on day d; a patient can be admitted on its
+    arrival day or up to max_wait days later. Each day a model over the next horizon days is
+    solved with per-day capacities, only that day's admissions are committed and the window
+    slides forward, warm-started from the previous solution. Returns one response per day with
+    the admissions committed that day and the patients whose wait ended without a bed; since
+    patient ids repeat across days, allocations are keyed by ( arrival day, patient id ).
+    """
+    if env is None and quiet:
+        env = get_env( quiet = True )
+
+    params = daily_scenarios[0].parameters
+    icu_types = list( params.icu_capacities.keys(  ) )
+    capacities = [ params.icu_capacities[icu_type] for icu_type in icu_types ]
+    daily_costs = [ params.daily_costs[icu_type] for icu_type in icu_types ]
+    total_capacity = sum( capacities )
+    include_survival_out_icu, sense = STRATEGY_OBJECTIVES[strategy]
+    num_days = len( daily_scenarios )
+
+    batches = [ PatientBatch.from_scenario( scenario ) for scenario in daily_scenarios ]
+    ids = np.concatenate( [ batch.ids for batch in batches ] ).tolist(  )
+    first_of_day = np.cumsum( [ 0 ] + [ len( batch ) for batch in batches ] ).tolist(  )
+    arrival_day = np.concatenate( [ np.full( len( batch ), day ) for day, batch in enumerate( batches ) ] ).tolist(  )
+    survival_prob_in_icu = np.concatenate( [ batch.survival_prob_in_icu for batch in batches ] ).tolist(  )
+    survival_prob_out_icu = np.concatenate( [ batch.survival_prob_out_icu for batch in batches ] ).tolist(  )
+    days_of_occupancy = np.concatenate( [ batch.days_of_occupancy_for( icu_types ) for batch in batches ] ).tolist(  )
+
+    # Beds held by committed admissions, per day and ICU type
+    occupied = np.zeros( ( num_days + max( ( max( row ) for row in days_of_occupancy ), default = 0 ) + 1, len( icu_types ) ), dtype = int )
+    admitted = [ -1 ] * len( ids )
+    previous_solution = {}
+    responses = []
+
+    for day in range( num_days ):
+        last_day = min( day + horizon, num_days ) - 1
+        # Patients still waiting or arriving within the window
+        candidates = [
+            p for p in range( first_of_day[max( 0, day - max_wait )], first_of_day[last_day + 1] )
+            if admitted[p] < 0
+        ]
+
+        model = Model( env = env )
+        if quiet:
+            model.Params.OutputFlag = 0
+
+        # Decision variables: admit patient p to ICU type t on day d of the window
+        x = {}
+        for p in candidates:
+            for d in range( max( arrival_day[p], day ), min( arrival_day[p] + max_wait, last_day ) + 1 ):
+                for t in range( len( icu_types ) ):
+                    x[p, t, d] = model.addVar( vtype = GRB.BINARY )
+        theta = { d: model.addVar( lb = 0, vtype = GRB.CONTINUOUS ) for d in range( day, last_day + 1 ) }
+
+        # Constraints
+        by_patient = {}
+        active = { ( t, d ): [] for t in range( len( icu_types ) ) for d in range( day, last_day + 1 ) }
+        for ( p, t, d ), var in x.items(  ):
+            by_patient.setdefault( p, [] ).append( var )
+            for held in range( d, min( d + days_of_occupancy[p][t], last_day + 1 ) ):
+                active[t, held].append( var )
+
+        for variables in by_patient.values(  ):
+            model.addConstr( quicksum( variables ) <= 1 )
+
+        for ( t, d ), variables in active.items(  ):
+            model.addConstr( quicksum( variables ) <= capacities[t] - occupied[d, t] )
+
+        # Penalty for occupancy deviation, per day of the window
+        for d in range( day, last_day + 1 ):
+            total_occupied = int( occupied[d].sum(  ) ) + quicksum( var for t in range( len( icu_types ) ) for var in active[t, d] )
+            model.addConstr( ( total_occupied / total_capacity - params.ideal_occupancy_rate ) + theta[d] >= 0 )
+
+        # Objective function components
+        survival_in_icu = quicksum( var * survival_prob_in_icu[p] for ( p, t, d ), var in x.items(  ) )
+        survival_out_icu = quicksum( ( 1 - quicksum( by_patient.get( p, [] ) ) ) * survival_prob_out_icu[p] for p in candidates )
+        occupancy_penalty = params.penalty_multiplier * quicksum( theta.values(  ) )
+        cost = quicksum( var * days_of_occupancy[p][t] * daily_costs[t] for ( p, t, d ), var in x.items(  ) )
+
+        objective = survival_in_icu - occupancy_penalty - cost
+        if include_survival_out_icu:
+            objective += survival_out_icu
+        model.setObjective( objective, sense )
+
+        # Warm start from the overlapping part of the previous window
+        for key, var in x.items(  ):
+            if key in previous_solution:
+                var.Start = previous_solution[key]
+
+        model.optimize(  )
+
+        # Commit only the first day of the window
+        admitted_today = []
+        previous_solution = {}
+        if model.status == GRB.OPTIMAL:
+            for ( p, t, d ), var in x.items(  ):
+                if var.X > 0.5 and d == day:
+                    admitted[p] = t
+                    occupied[day:day + days_of_occupancy[p][t], t] += 1
+                    admitted_today.append( p )
+                elif d > day:
+                    previous_solution[p, t, d] = round( var.X )
+
+        allocation = { ( arrival_day[p], ids[p] ): icu_types[admitted[p]] for p in admitted_today }
+        lost_today = [ p for p in candidates if admitted[p] < 0 and arrival_day[p] + max_wait == day ]
+        responses.append( ICUAllocationResponseModel(
+            id=daily_scenarios[day].id,
+            total_survival_in_icu=sum( survival_prob_in_icu[p] for p in admitted_today ),
+            total_survival_out_icu=sum( survival_prob_out_icu[p] for p in lost_today ),
+            total_cost=sum( days_of_occupancy[p][admitted[p]] * daily_costs[admitted[p]] for p in admitted_today ),
+            allocation=allocation
+         ) )
+
+    return responses
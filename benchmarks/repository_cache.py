@@ -0,0 +1,65 @@
+"""Benchmark of CachedRepository lookups against BaseRepository reads of the same collection.
+
+Writes num_items result rows to a temporary JSON-lines database and reports the best time
+of get_all and get_by_id for a cold BaseRepository read and a warm CachedRepository. The
+exit status is 1 when a warm CachedRepository.get_all is not faster than the cold read.
+
+    python -m benchmarks.repository_cache --items 5000
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+from app.database import JsonLinesDatabase
+from app.repositories.base_repository import BaseRepository
+from app.repositories.cached_repository import CachedRepository
+
+def result_rows(num_items: int, num_patients: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "total_survival_in_icu": 0.5 * num_patients,
+            "total_survival_out_icu": 0.3 * num_patients,
+            "total_cost": 0.1 * num_patients,
+            "allocation": {str(p): f"icu_{p % 3}" for p in range(num_patients)},
+        }
+        for i in range(num_items)
+    ]
+
+def best_time(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--patients", type=int, default=30, help="allocation entries per row")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        database = JsonLinesDatabase(data_dir)
+        database.write("results", result_rows(args.items, args.patients))
+        base, cached = BaseRepository("results"), CachedRepository("results")
+        base.database = cached.database = database
+        cached.get_all()  # Warm the cache
+
+        middle = args.items // 2
+        timings = {
+            "base_get_all": best_time(base.get_all, args.repeat),
+            "cached_get_all": best_time(cached.get_all, args.repeat),
+            "base_get_by_id": best_time(lambda: base.get_by_id(middle), args.repeat),
+            "cached_get_by_id": best_time(lambda: cached.get_by_id(middle), args.repeat),
+        }
+
+    print(json.dumps({name: round(seconds * 1000, 3) for name, seconds in timings.items()}, indent=2))
+    return 0 if timings["cached_get_all"] < timings["base_get_all"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Scaling benchmark of scenario generation, the allocation solvers and survival simulation.
+
+Sweeps patient count, number of ICU types and patient to bed ratio, timing every phase
+separately, and writes the results as JSON. With --compare, phases slower than a stored
+baseline by more than --tolerance are reported and the exit status is 1.
+
+    python -m benchmarks.solver_scaling --output bench.json
+    python -m benchmarks.solver_scaling --output new.json --compare bench.json
+"""
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import gurobipy
+import numpy as np
+
+from app.models import ParametersModel
+from app.services import GenerationService, SimulationService
+from app.solvers import AllocationModel, FCFSSolver, CombinatorialSolver, GreedySolver, get_env
+
+# Size limits of the restricted ( pip ) Gurobi license
+MAX_MILP_VARIABLES = 2000
+MAX_MILP_CONSTRAINTS = 2000
+MILP_STRATEGIES = ("MGS", "LSF", "MSF")
+RELAXED_GAP_TOLERANCE = 1e-3
+
+def benchmark_parameters(num_patients: int, num_icu_types: int, ratio: float) -> ParametersModel:
+    return ParametersModel.synthetic(num_icu_types, max(1, round(num_patients / ratio / num_icu_types)))
+
+class PhaseTimer:
+    def __init__(self):
+        self.phases = {}
+
+    def __call__(self, phase: str, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        self.phases[phase] = self.phases.get(phase, 0.0) + time.perf_counter() - start
+        return result
+
+def run_case(num_patients: int, num_icu_types: int, ratio: float, seed: int, milp: bool) -> dict:
+    parameters = benchmark_parameters(num_patients, num_icu_types, ratio)
+    generation_service = GenerationService(parameters)
+    simulation_service = SimulationService(generation_service)
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+    timer = PhaseTimer()
+
+    timer("generation_patient_models", generation_service.generate_scenario, 0, num_patients)
+    scenario = timer("generation", generation_service.generate_scenario_batch, 0, num_patients, rng)
+    responses = {
+        "FCFS": timer("solve_FCFS", FCFSSolver, scenario),
+        "COMBINATORIAL": timer("solve_COMBINATORIAL", CombinatorialSolver, scenario),
+        "GREEDY": timer("solve_GREEDY", GreedySolver, scenario),
+    }
+    if milp:
+        allocation_model = timer("model_build", AllocationModel, scenario, get_env(True), True)
+        for strategy in MILP_STRATEGIES:
+            timer(f"optimize_{strategy}", allocation_model.optimize, strategy)
+            timer(f"extract_{strategy}", allocation_model.extract)
+            responses[strategy] = allocation_model.response()
+        for strategy in MILP_STRATEGIES:
+            timer(f"relaxed_{strategy}", allocation_model.solve_relaxed, strategy, RELAXED_GAP_TOLERANCE)
+
+    for strategy, response in responses.items():
+        timer("survival_simulation", simulation_service.simulate_survival, scenario, response.allocation, rng)
+    return timer.phases
+
+def run_benchmarks(patient_counts, icu_type_counts, ratios, repeat: int, seed: int, measure_memory: bool) -> list[dict]:
+    results = []
+    for num_patients, num_icu_types, ratio in itertools.product(patient_counts, icu_type_counts, ratios):
+        milp = (num_patients * num_icu_types + 1 <= MAX_MILP_VARIABLES
+                and num_patients + num_icu_types + 1 <= MAX_MILP_CONSTRAINTS)
+
+        # Best of repeat runs per phase, then one traced run for peak Python memory
+        phases = {}
+        for _ in range(repeat):
+            for phase, seconds in run_case(num_patients, num_icu_types, ratio, seed, milp).items():
+                phases[phase] = min(seconds, phases.get(phase, float("inf")))
+
+        peak_memory = None
+        if measure_memory:
+            tracemalloc.start()
+            run_case(num_patients, num_icu_types, ratio, seed, milp)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        result = {
+            "num_patients": num_patients,
+            "num_icu_types": num_icu_types,
+            "ratio": ratio,
+            "milp": milp,
+            "phases": phases,
+            "peak_memory_bytes": peak_memory,
+        }
+        results.append(result)
+        print(f"patients={num_patients} icu_types={num_icu_types} ratio={ratio} "
+              + " ".join(f"{phase}={seconds * 1000:.2f}ms" for phase, seconds in phases.items()), file=sys.stderr)
+    return results
+
+def case_key(result: dict) -> tuple:
+    return (result["num_patients"], result["num_icu_types"], result["ratio"])
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float, min_seconds: float) -> list[str]:
+    """Phases slower than the baseline by more than tolerance ( and min_seconds ) in cases present in both."""
+    baseline_cases = {case_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        reference = baseline_cases.get(case_key(result))
+        if reference is None:
+            continue
+        for phase, seconds in result["phases"].items():
+            reference_seconds = reference["phases"].get(phase)
+            if reference_seconds is None:
+                continue
+            if seconds > reference_seconds * (1 + tolerance) and seconds - reference_seconds > min_seconds:
+                regressions.append(
+                    f"{case_key(result)} {phase}: {reference_seconds * 1000:.2f}ms -> {seconds * 1000:.2f}ms"
+                )
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, nargs="+", default=[50, 200, 600])
+    parser.add_argument("--icu-types", type=int, nargs="+", default=[1, 3])
+    parser.add_argument("--ratios", type=float, nargs="+", default=[0.5, 1.0, 2.0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run measuring peak memory")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="baseline results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-seconds", type=float, default=0.002, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.patients, args.icu_types, args.ratios, args.repeat, args.seed, not args.no_memory)
+    with open(args.output, "w") as f:
+        json.dump({
+            "environment": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "gurobi": ".".join(map(str, gurobipy.gurobi.version())),
+                "machine": platform.machine(),
+            },
+            "results": results,
+        }, f, indent=4)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Command line entry point of the allocation service.
+
+    python main.py serve --socket /tmp/icu.sock --workers 4
+    python main.py load --socket /tmp/icu.sock --requests 5000 --concurrency 128
+"""
+import argparse
+import asyncio
+import json
+import signal
+import sys
+
+from app.models import ParametersModel
+
+def load_parameters(args) -> ParametersModel:
+    if args.parameters:
+        with open(args.parameters) as f:
+            return ParametersModel.from_dict(json.load(f))
+    return ParametersModel.synthetic(args.icu_types, args.beds_per_type)
+
+async def serve(args):
+    from app.allocation_server import AllocationServer
+    server = AllocationServer(
+        load_parameters(args),
+        workers=args.workers,
+        batch_window=args.batch_window_ms / 1000,
+        max_batch_size=args.max_batch_size,
+        queue_size=args.queue_size,
+        warm_milp=not args.no_milp,
+    )
+    await server.start(args.socket, args.host, args.port)
+    print(f"Serving on {server.address}", file=sys.stderr)
+    loop = asyncio.get_running_loop()
+    stop = loop.create_future()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stop.cancel)
+    try:
+        await asyncio.wait([stop, asyncio.ensure_future(server.serve_forever())], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        print(json.dumps(server.stats()), file=sys.stderr)
+        await server.close()
+
+async def load(args):
+    from app.allocation_client import run_load
+    report = await run_load(
+        load_parameters(args),
+        num_requests=args.requests,
+        concurrency=args.concurrency,
+        connections=args.connections,
+        num_patients=args.patients,
+        strategy=args.strategy,
+        seed=args.seed,
+        path=args.socket,
+        host=args.host,
+        port=args.port,
+    )
+    print(json.dumps(report, indent=4))
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the allocation service")
+    load_parser = commands.add_parser("load", help="measure throughput and latency of a running service")
+    for command in (serve_parser, load_parser):
+        command.add_argument("--socket", help="Unix socket path ( TCP on --host/--port otherwise )")
+        command.add_argument("--host", default="127.0.0.1")
+        command.add_argument("--port", type=int, default=8765)
+        command.add_argument("--parameters", help="JSON file of ParametersModel fields ( synthetic parameters otherwise )")
+        command.add_argument("--icu-types", type=int, default=3)
+        command.add_argument("--beds-per-type", type=int, default=10)
+
+    serve_parser.add_argument("--workers", type=int, help="solver processes ( one per CPU by default )")
+    serve_parser.add_argument("--batch-window-ms", type=float, default=5.0)
+    serve_parser.add_argument("--max-batch-size", type=int, default=32)
+    serve_parser.add_argument("--queue-size", type=int, default=1024, help="requests waiting before reads pause")
+    serve_parser.add_argument("--no-milp", action="store_true", help="do not start Gurobi environments in the workers")
+
+    load_parser.add_argument("--requests", type=int, default=1000)
+    load_parser.add_argument("--concurrency", type=int, default=64)
+    load_parser.add_argument("--connections", type=int, default=4)
+    load_parser.add_argument("--patients", type=int, default=20, help="arriving patients per request")
+    load_parser.add_argument("--strategy", default="GREEDY")
+    load_parser.add_argument("--seed", type=int)
+
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args) if args.command == "serve" else load(args))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+from app.models import ParametersModel
+from app.services import GenerationService
+import numpy as np
+import pytest
+
+@pytest.fixture( scope = "session" )
+def gurobi_env(  ):
+    """Silent pooled Gurobi environment; tests using it are skipped without gurobipy or a license."""
+    gurobipy = pytest.importorskip( "gurobipy" )
+    from app.solvers import get_env
+    try:
+        return get_env( quiet = True )
+    except gurobipy.GurobiError as e:
+        pytest.skip( f"Gurobi environment unavailable: {e}" )
+
+@pytest.fixture
+def random_scenario(  ):
+    """Factory of small seeded scenarios with random ICU types, capacities, penalty and ideal occupancy."""
+    def make( seed: int ):
+        rng = np.random.default_rng( seed )
+        parameters = ParametersModel.synthetic( num_icu_types = int( rng.integers( 1, 4 ) ), beds_per_type = int( rng.integers( 1, 8 ) ), id = seed )
+        parameters.penalty_multiplier = float( rng.uniform( 0.0, 3.0 ) )
+        parameters.ideal_occupancy_rate = float( rng.uniform( 0.5, 1.0 ) )
+        return GenerationService( parameters ).generate_scenario_batch( seed, int( rng.integers( 1, 25 ) ), rng )
+    return make
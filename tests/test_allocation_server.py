@@ -0,0 +1,34 @@
+from app.allocation_client import AllocationClient
+from app.allocation_server import AllocationServer
+from app.models import ParametersModel
+from app.services import GenerationService
+import asyncio
+import os
+import signal
+import numpy as np
+import pytest
+
+def test_server_replaces_a_broken_worker_pool( tmp_path ):
+    parameters = ParametersModel.synthetic( beds_per_type = 3 )
+    patients = GenerationService( parameters ).generate_scenario_batch( 0, 12, np.random.default_rng( 0 ) ).patients.to_records(  )
+
+    async def run(  ):
+        server = AllocationServer( parameters, workers = 1, warm_milp = False )
+        path = str( tmp_path / "allocation.sock" )
+        await server.start( path )
+        try:
+            async with AllocationClient( path ) as client:
+                expected = await client.arrivals( patients )
+                for process in list( server._executor._processes.values(  ) ):
+                    os.kill( process.pid, signal.SIGKILL )
+                    process.join(  )
+
+                # The batch in flight on the dead pool fails, later ones run on a new pool
+                with pytest.raises( RuntimeError, match = "BrokenProcessPool" ):
+                    await client.arrivals( patients )
+                assert await client.arrivals( patients ) == expected
+                assert ( await client.stats(  ) )["pool_restarts"] == 1
+        finally:
+            await server.close(  )
+
+    asyncio.run( run(  ) )
@@ -0,0 +1,17 @@
+from app.solvers import CombinatorialSolver
+import pytest
+
+@pytest.mark.parametrize( "strategy", [ "MGS", "LSF" ] )
+@pytest.mark.parametrize( "seed", range( 30 ) )
+def test_objective_matches_milp( gurobi_env, random_scenario, strategy, seed ):
+    from app.solvers import AllocationModel
+    scenario = random_scenario( seed )
+    expected = AllocationModel( scenario, gurobi_env, quiet = True ).solve( strategy )
+    response = CombinatorialSolver( scenario, strategy )
+
+    assert response.objective == pytest.approx( expected.objective, rel = 1e-4, abs = 1e-6 )
+
+def test_unbounded_strategy_allocates_nothing( random_scenario ):
+    response = CombinatorialSolver( random_scenario( 0 ), "MSF" )
+    assert response.allocation == {}
+    assert response.objective is None
@@ -0,0 +1,48 @@
+from app.database import Database, JsonLinesDatabase, ItemNotFoundError
+import random
+import pytest
+
+def apply( database, operation ):
+    """Run one operation, returning the error type it raised, if any."""
+    try:
+        getattr( database, operation[0] )( "items", *operation[1:] )
+    except ItemNotFoundError as e:
+        return type( e )
+
+@pytest.mark.parametrize( "seed", range( 5 ) )
+def test_json_lines_engine_matches_full_rewrites( tmp_path, seed ):
+    rng = random.Random( seed )
+    reference = Database( str( tmp_path / "reference" ) )
+    database = JsonLinesDatabase( str( tmp_path / "log" ), compaction_ratio = rng.choice( [ 0.3, 0.5, 10 ] ), background_compaction = False )
+
+    for step in range( 600 ):
+        draw = rng.random(  )
+        item = { "id": rng.randrange( 30 ), "group": rng.randrange( 5 ), "step": step }
+        identifier = rng.choice( [ "id", "group" ] )
+        if draw < 0.4:
+            operation = ( "append", item )
+        elif draw < 0.7:
+            operation = ( "update", item, identifier )
+        elif draw < 0.9:
+            operation = ( "delete", identifier, item[identifier] )
+        else:
+            if rng.random(  ) < 0.3:  # A new instance replays the log from disk
+                database = JsonLinesDatabase( database.data_dir, background_compaction = False )
+            assert database.read( "items" ) == reference.read( "items" )
+            continue
+        assert apply( database, operation ) == apply( reference, operation )
+    assert database.read( "items" ) == reference.read( "items" )
+
+@pytest.mark.parametrize( "num_existing", [ 0, 10 ] )
+def test_appends_count_towards_the_compaction_ratio( tmp_path, num_existing ):
+    if num_existing:
+        JsonLinesDatabase( str( tmp_path ) ).write( "items", [ { "id": -i } for i in range( 1, num_existing + 1 ) ] )
+    database = JsonLinesDatabase( str( tmp_path ), compaction_ratio = 0.5, background_compaction = False )
+    database.read( "items" )
+    for i in range( 1000 ):
+        database.append( "items", { "id": i } )
+    database.delete( "items", "id", 0 )
+
+    assert database._tombstones["items"] == ( 1, num_existing + 1001 )
+    with open( database._get_log_path( "items" ) ) as f:
+        assert len( f.readlines(  ) ) == num_existing + 1001  # Not compacted
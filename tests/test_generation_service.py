@@ -0,0 +1,25 @@
+from app.models import ParametersModel
+from app.services import GenerationService
+from app.services.generation_service import VERY_LOW_SURVIVAL_PROBABILITY
+import numpy as np
+import pytest
+
+def generate( survival_out_icu: dict, num_patients: int = 200 ):
+    parameters = ParametersModel.synthetic(  )
+    parameters.sofa_to_survival_out_icu = survival_out_icu
+    return GenerationService( parameters ).generate_scenario_batch( 0, num_patients, np.random.default_rng( 0 ) ).patients
+
+def test_very_low_entries_get_their_probability_and_flag(  ):
+    table = ParametersModel.synthetic(  ).sofa_to_survival_out_icu
+    patients = generate( { score: "very low" if score >= 3 else value for score, value in table.items(  ) } )
+    very_low = patients.sofa_scores.sum( axis = 1 ) >= 3
+    assert very_low.any(  ) and not np.isnan( patients.survival_prob_out_icu ).any(  )
+    assert ( patients.survival_prob_out_icu[very_low] == VERY_LOW_SURVIVAL_PROBABILITY ).all(  )
+    assert ( patients.burn_priority_non_icu[very_low & patients.is_burn_patient] == 1 ).all(  )
+
+def test_drawn_scores_missing_or_not_numeric_raise(  ):
+    table = ParametersModel.synthetic(  ).sofa_to_survival_out_icu
+    with pytest.raises( KeyError ):
+        generate( { score: value for score, value in table.items(  ) if score <= 8 } )
+    with pytest.raises( ValueError, match = "not a number" ):
+        generate( { score: "unknown" if score >= 3 else value for score, value in table.items(  ) } )
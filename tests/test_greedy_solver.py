@@ -0,0 +1,46 @@
+from app.models import ParametersModel, PatientBatch, ScenarioModel
+from app.solvers import CombinatorialSolver, GreedySolver
+import numpy as np
+
+def scenario( survival_in, survival_out, days, burn_priority = None, beds_per_type = 2, num_icu_types = 1, penalty_multiplier = 1.0 ):
+    """Hand-built scenario; days gives each patient's days of occupancy in every ICU type."""
+    parameters = ParametersModel.synthetic( num_icu_types = num_icu_types, beds_per_type = beds_per_type )
+    parameters.penalty_multiplier = penalty_multiplier
+    n = len( survival_in )
+    patients = PatientBatch(
+        ids=np.arange( 1, n + 1 ),
+        icu_types=list( parameters.icu_capacities.keys(  ) ),
+        sofa_scores=np.zeros( ( n, 6 ), dtype = np.int8 ),
+        survival_prob_in_icu=np.array( survival_in, dtype = float ),
+        survival_prob_out_icu=np.array( survival_out, dtype = float ),
+        days_of_occupancy=np.array( days, dtype = int ).reshape( n, -1 ),
+        burn_priority_icu=None if burn_priority is None else np.array( burn_priority, dtype = np.int8 ),
+     )
+    return ScenarioModel( id=0, patients=patients, parameters=parameters )
+
+def test_admits_by_net_marginal_benefit(  ):
+    # MGS values survival gain minus cost: 0.79, 0.09 and 0.8 ( 0.9 gain, 10 days at 0.01 )
+    instance = scenario( [ 0.9, 0.6, 0.95 ], [ 0.1, 0.5, 0.05 ], [ 1, 1, 10 ] )
+    assert GreedySolver( instance, "MGS" ).allocation == { 3: "icu_0", 1: "icu_0" }
+    # LSF ignores survival outside the ICU: 0.89, 0.59 and 0.85
+    assert GreedySolver( instance, "LSF" ).allocation == { 1: "icu_0", 3: "icu_0" }
+
+def test_picks_the_most_valuable_icu_type_per_patient(  ):
+    # icu_1 costs 0.02 a day against 0.01 for icu_0, so shorter stays decide the type
+    instance = scenario( [ 0.9, 0.9 ], [ 0.1, 0.1 ], [ [ 10, 1 ], [ 1, 10 ] ], beds_per_type = 1, num_icu_types = 2 )
+    assert GreedySolver( instance, "MGS" ).allocation == { 1: "icu_1", 2: "icu_0" }
+
+def test_burn_priority_breaks_ties(  ):
+    instance = scenario( [ 0.8, 0.8, 0.8 ], [ 0.2, 0.2, 0.2 ], [ 2, 2, 2 ], burn_priority = [ 1, 5, 3 ], beds_per_type = 1 )
+    assert GreedySolver( instance, "MGS" ).allocation == { 2: "icu_0" }
+
+def test_stops_when_admission_no_longer_improves_the_objective(  ):
+    # Without occupancy penalty a patient surviving better outside the ICU is never admitted
+    instance = scenario( [ 0.9, 0.3 ], [ 0.1, 0.5 ], [ 1, 1 ], beds_per_type = 4, penalty_multiplier = 0.0 )
+    assert GreedySolver( instance, "MGS" ).allocation == { 1: "icu_0" }
+
+    # With it, the second and third admissions reduce the penalty by 0.25 against a loss of 0.21, the fourth only by 0.10
+    instance = scenario( [ 0.9, 0.3, 0.3, 0.3 ], [ 0.1, 0.5, 0.5, 0.5 ], [ 1, 1, 1, 1 ], beds_per_type = 4 )
+    response = GreedySolver( instance, "MGS" )
+    assert response.allocation == { 1: "icu_0", 2: "icu_0", 3: "icu_0" }
+    assert response.objective == CombinatorialSolver( instance, "MGS" ).objective
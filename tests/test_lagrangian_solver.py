@@ -0,0 +1,35 @@
+from app.models import ParametersModel
+from app.services import GenerationService
+from app.solvers import CombinatorialSolver, LagrangianSolver
+import numpy as np
+import pytest
+
+# Relative distance of objective and bound to the optimum accepted on small scenarios, where
+# a few discrete admissions leave a duality gap, and on large ones, where it vanishes
+SMALL_TOLERANCE = 0.02
+LARGE_TOLERANCE = 1e-3
+
+def assert_brackets( response, optimum: float, tolerance: float ):
+    assert response.objective <= optimum + 1e-6 * abs( optimum ) + 1e-9
+    assert response.bound >= optimum - 1e-6 * abs( optimum ) - 1e-9
+    assert response.objective >= optimum - tolerance * abs( optimum )
+    assert response.bound <= optimum + tolerance * abs( optimum )
+    assert response.gap == pytest.approx( ( response.bound - response.objective ) / abs( response.objective ), abs = 1e-12 )
+
+@pytest.mark.parametrize( "strategy", [ "MGS", "LSF" ] )
+@pytest.mark.parametrize( "seed", range( 30 ) )
+def test_brackets_milp_optimum( gurobi_env, random_scenario, strategy, seed ):
+    from app.solvers import AllocationModel
+    scenario = random_scenario( seed )
+    expected = AllocationModel( scenario, gurobi_env, quiet = True ).solve( strategy )
+    assert expected.gap <= 1e-9  # Small enough to be solved to optimality
+    assert_brackets( LagrangianSolver( scenario, strategy ), expected.objective, SMALL_TOLERANCE )
+
+@pytest.mark.parametrize( "strategy", [ "MGS", "LSF" ] )
+def test_brackets_optimum_beyond_the_milp_size( strategy ):
+    # 60000 binary variables, far above what the MILP path builds, against the exact combinatorial optimum
+    parameters = ParametersModel.synthetic( num_icu_types = 3, beds_per_type = 2000 )
+    scenario = GenerationService( parameters ).generate_scenario_batch( 0, 20000, np.random.default_rng( 1 ) )
+    response = LagrangianSolver( scenario, strategy )
+    assert response.gap <= LARGE_TOLERANCE
+    assert_brackets( response, CombinatorialSolver( scenario, strategy ).objective, LARGE_TOLERANCE )
@@ -0,0 +1,9 @@
+from app.solvers import CombinatorialSolver, GreedySolver, LagrangianSolver, get_solver
+import pytest
+
+@pytest.mark.parametrize( "name, solver", [ ( "COMBINATORIAL", CombinatorialSolver ), ( "GREEDY", GreedySolver ), ( "LAGRANGIAN", LagrangianSolver ) ] )
+@pytest.mark.parametrize( "objective", [ "MGS", "LSF", "MSF" ] )
+def test_registered_objective_is_solved( random_scenario, name, solver, objective ):
+    scenario = random_scenario( 3 )
+    registered = name if objective == "MGS" else f"{name}_{objective}"
+    assert get_solver( registered )( scenario ) == solver( scenario, objective )
@@ -0,0 +1,40 @@
+from app.instrumentation import Instrumentation
+from app.models import ParametersModel
+from app.services import GenerationService, SimulationService
+from app.solvers import SolverResultCache
+
+def test_parallel_sweep_fills_the_parent_cache(  ):
+    cache = SolverResultCache(  )
+    service = SimulationService( GenerationService( ParametersModel.synthetic( beds_per_type = 5 ) ), result_cache = cache )
+    strategies = [ "FCFS", "GREEDY" ]
+
+    first = service.simulate( 2, [ 0.5, 1.0 ], seed = 1, workers = 2, strategies = strategies )
+    assert ( cache.hits, cache.misses ) == ( 0, 8 )
+
+    second = service.simulate( 2, [ 0.5, 1.0 ], seed = 1, workers = 2, strategies = strategies )
+    assert ( cache.hits, cache.misses ) == ( 8, 8 )
+    assert second == first
+
+def test_sequential_min_difference_stops_once_the_target_is_resolved(  ):
+    service = SimulationService( GenerationService( ParametersModel.synthetic( beds_per_type = 5 ) ) )
+    strategies = [ "FCFS", "GREEDY" ]
+
+    unbounded = service.simulate_sequential( [ 1.0 ], half_width = 1e-3, seed = 1, max_rounds = 60, strategies = strategies )
+    targeted = service.simulate_sequential( [ 1.0 ], half_width = 1e-3, seed = 1, max_rounds = 60, strategies = strategies, min_difference = 3.0 )
+
+    assert all( estimate.num_replications == 60 for estimate in unbounded[ 1.0 ].values(  ) )
+    assert all( estimate.num_replications < 60 for estimate in targeted[ 1.0 ].values(  ) )
+    fcfs, greedy = targeted[ 1.0 ][ "FCFS" ], targeted[ 1.0 ][ "GREEDY" ]
+    half_widths = ( fcfs.confidence_interval[ 1 ] - fcfs.mean ) + ( greedy.confidence_interval[ 1 ] - greedy.mean )
+    assert half_widths <= 3.0 or abs( fcfs.mean - greedy.mean ) > half_widths
+
+def test_common_random_numbers_records_one_scenario_per_ratio(  ):
+    instrumentation = Instrumentation(  )
+    service = SimulationService( GenerationService( ParametersModel.synthetic( beds_per_type = 5 ) ), instrumentation = instrumentation )
+
+    service.simulate( 2, [ 0.5, 1.0, 1.5 ], seed = 1, common_random_numbers = True, strategies = [ "FCFS" ] )
+
+    summary = instrumentation.summary(  )
+    assert summary[ "num_scenarios" ] == 6
+    assert summary[ "phases" ][ "generation" ][ "count" ] == 2
+    assert all( "ratio" in record[ "labels" ] for record in instrumentation.records )
@@ -0,0 +1,30 @@
+from app.models import PatientBatch
+from app.solvers import CombinatorialSolver, GreedySolver, LagrangianSolver
+from app.solvers.combinatorial_solver import strategy_coefficients
+from collections import Counter
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize( "solver", [ CombinatorialSolver, GreedySolver, LagrangianSolver ] )
+@pytest.mark.parametrize( "strategy", [ "MGS", "LSF" ] )
+@pytest.mark.parametrize( "seed", range( 20 ) )
+def test_allocation_is_feasible_and_matches_reported_totals( random_scenario, solver, strategy, seed ):
+    scenario = random_scenario( seed )
+    params = scenario.parameters
+    response = solver( scenario, strategy )
+
+    used = Counter( response.allocation.values(  ) )
+    assert all( used[icu_type] <= capacity for icu_type, capacity in params.icu_capacities.items(  ) )
+
+    # Objective and survival totals recomputed from the allocation alone
+    patients = PatientBatch.from_scenario( scenario )
+    icu_types = list( params.icu_capacities.keys(  ) )
+    rows = patients.positions( response.allocation.keys(  ) )
+    types = np.array( [ icu_types.index( icu_type ) for icu_type in response.allocation.values(  ) ], dtype = int )
+    values, constant, theta_coefficient = strategy_coefficients( scenario, strategy )
+    theta = max( 0.0, params.ideal_occupancy_rate - len( rows ) / sum( params.icu_capacities.values(  ) ) )
+    assert response.objective == pytest.approx( constant + values[rows, types].sum(  ) + theta_coefficient * theta )
+    assert response.total_survival_in_icu == pytest.approx( patients.survival_prob_in_icu[rows].sum(  ) )
+    assert response.total_survival_in_icu + response.total_survival_out_icu == pytest.approx(
+        patients.survival_prob_in_icu[rows].sum(  ) + np.delete( patients.survival_prob_out_icu, rows ).sum(  )
+    )